@@ -1,64 +1,264 @@
+import hashlib
+import logging
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
 from prefect import flow
+from prefect.blocks.system import JSON
 from prefect.logging import get_run_logger
 from tasks.run_sessions import run_session_and_wait_for_analysis
 from utils.iteration_artifacts import create_progress_artifact
-from typing import List, Optional
+from typing import Any, Dict, Final, List, Optional, Tuple
+
+_DEFAULT_INITIAL_PROMPT: Final[str] = (
+    "Create a simple Python function that calculates fibonacci numbers. "
+    "Include docstring and type hints."
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SessionResult:
+    """The parts of a session result the iteration loop reads."""
+
+    session_id: str
+    suggested_prompt: Optional[str] = None
+    issue_count: int = 0
+
+    @classmethod
+    def from_task_result(cls, result: Dict[str, Any]) -> "SessionResult":
+        return cls(
+            session_id=result["session_id"],
+            suggested_prompt=result.get("suggested_prompt"),
+            issue_count=len((result.get("analysis") or {}).get("issues") or []),
+        )
+
+
+# Prompts already run in this process and their session results, keyed by
+# exact prompt hash
+_PROMPT_CACHE: Dict[bytes, Tuple[str, SessionResult]] = {}
+
+
+def _prompt_key(prompt: str) -> bytes:
+    """Hash a prompt for exact-match cache lookups."""
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest()
+
+
+def _normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and case so cosmetic rewrites compare equal."""
+    return " ".join(prompt.split()).casefold()
+
+
+@lru_cache(maxsize=256)
+def _norm_hash(prompt: str) -> bytes:
+    """Digest of the normalized prompt, compared instead of the full text.
+
+    Memoized because the same prompt is hashed for the convergence check, the
+    cycle set and session coalescing.
+    """
+    return hashlib.blake2b(
+        _normalize_prompt(prompt).encode("utf-8"), digest_size=16
+    ).digest()
+
+
+def _find_similar_result(prompt: str, threshold: float) -> Optional[SessionResult]:
+    """Return the cached result of the most similar earlier prompt, if close enough."""
+    best_ratio, best_result = threshold, None
+    matcher = SequenceMatcher(autojunk=False)
+    matcher.set_seq2(prompt)
+    for cached_prompt, result in _PROMPT_CACHE.values():
+        matcher.set_seq1(cached_prompt)
+        # The quick ratios are upper bounds, so most candidates are rejected cheaply
+        if (
+            matcher.real_quick_ratio() >= best_ratio
+            and matcher.quick_ratio() >= best_ratio
+            and matcher.ratio() >= best_ratio
+        ):
+            best_ratio, best_result = matcher.ratio(), result
+    return best_result
+
+
+def _load_iteration_state(resume_key: str) -> Optional[Dict[str, List[str]]]:
+    """Load the progress saved under resume_key by an earlier run, if any."""
+    try:
+        return JSON.load(resume_key).value
+    except ValueError:
+        return None
+
+
+def _save_iteration_state(
+    resume_key: str, prompt_history: List[str], session_ids: List[str]
+) -> None:
+    """Save the progress so far so a later run can resume from it."""
+    JSON(
+        value={"prompt_history": prompt_history, "session_ids": session_ids}
+    ).save(resume_key, overwrite=True)
+
+
+def _run_prompt_variants(
+    prompts: List[str], base_title: str, use_cache: bool
+) -> Tuple[str, SessionResult]:
+    """Run alternative first prompts concurrently; keep the one with fewest issues."""
+    logger = get_run_logger()
+
+    results: Dict[str, SessionResult] = {}
+    # Variants that only differ cosmetically share one session
+    futures = {}
+    pending = []
+    for k, prompt in enumerate(prompts):
+        cached = _PROMPT_CACHE.get(_prompt_key(prompt)) if use_cache else None
+        if cached:
+            results[prompt] = cached[1]
+            continue
+        norm_hash = _norm_hash(prompt)
+        if norm_hash not in futures:
+            futures[norm_hash] = run_session_and_wait_for_analysis.submit(
+                prompt=prompt, title=f"{base_title} - Iteration 1.{k + 1}"
+            )
+        pending.append((prompt, norm_hash))
+
+    for prompt, norm_hash in pending:
+        results[prompt] = SessionResult.from_task_result(futures[norm_hash].result())
+        _PROMPT_CACHE[_prompt_key(prompt)] = (prompt, results[prompt])
+
+    best_prompt = min(results, key=lambda prompt: results[prompt].issue_count)
+    logger.info(
+        f"🏁 Kept variant {prompts.index(best_prompt) + 1}/{len(prompts)} "
+        f"({results[best_prompt].issue_count} issues)"
+    )
+    return best_prompt, results[best_prompt]
 
 
 @flow(log_prints=False)
 def iterate_on_prompt(
-    initial_prompt: str = "Create a simple Python function that calculates fibonacci numbers. Include docstring and type hints.",
+    initial_prompt: Optional[str] = None,
     base_title: str = "Prompt Iteration",
     iterations: int = 3,
+    use_cache: bool = True,
+    similar_prompt_cache: bool = False,
+    similarity_threshold: float = 0.92,
+    prompt_variants: Optional[List[str]] = None,
+    resume_key: Optional[str] = None,
 ) -> List[str]:
     """
     Iterate on a prompt using Devin's suggested improvements.
 
     Args:
-        initial_prompt: The starting prompt to iterate on
+        initial_prompt: The starting prompt to iterate on (defaults to a simple
+            fibonacci function prompt)
         base_title: Base title for the sessions (will append iteration number)
         iterations: Number of iterations (max 10)
+        use_cache: Reuse the result of a prompt already run in this process
+        similar_prompt_cache: Also reuse the result of a near-identical prompt
+        similarity_threshold: Minimum similarity ratio (0-1) for a near-identical match
+        prompt_variants: Alternative phrasings of the initial prompt, run concurrently
+            with it in the first iteration; the one with fewest issues is kept
+        resume_key: Name of a JSON block that progress is saved to after every
+            iteration; a later run with the same key resumes where it stopped
 
     Returns:
         List of session IDs from each iteration
     """
     logger = get_run_logger()
 
+    if initial_prompt is None:
+        initial_prompt = _DEFAULT_INITIAL_PROMPT
+
     # Validate iterations
-    if iterations > 10:
-        logger.warning(f"Iterations capped at 10 (requested: {iterations})")
-        iterations = 10
+    capped = min(max(iterations, 0), 10)
+    if capped != iterations:
+        logger.warning(f"Iterations capped at {capped} (requested: {iterations})")
+        iterations = capped
 
     current_prompt = initial_prompt
     session_ids = []
     prompt_history = [initial_prompt]  # Track prompt evolution
 
+    start = 0
+    state = _load_iteration_state(resume_key) if resume_key else None
+    if state:
+        done_ids = state["session_ids"][:iterations]
+        history = state["prompt_history"][: len(done_ids) + 1]
+        session_ids = list(done_ids)
+        prompt_history = list(history)
+        current_prompt = history[-1]
+        # No prompt beyond the last session means the earlier run converged
+        start = len(done_ids) if len(history) > len(done_ids) else iterations
+        logger.info(f"⏯️ Resuming '{resume_key}' after {len(done_ids)} iterations")
+
     logger.info(f"🚀 Starting prompt iteration with {iterations} max iterations")
     logger.info(f"📝 Initial prompt: {current_prompt[:100]}...")
+    current_hash = _norm_hash(current_prompt)
+    # Every prompt seen so far, so a suggestion cycling back to one ends the loop
+    seen = {_norm_hash(prompt) for prompt in prompt_history}
 
-    for i in range(iterations):
+    # Iterations are strictly sequential: each prompt is taken from the previous
+    # session's analysis and an unchanged prompt ends the loop, so a session
+    # launched speculatively with the current prompt could never be used. Only
+    # the first iteration can fan out, across caller-supplied prompt variants.
+    for i in range(start, iterations):
         logger.info(f"\n--- Iteration {i + 1}/{iterations} ---")
-        logger.info(f"📋 Current prompt:\n{current_prompt}\n")
+        # Prompts can be several KB, so only format them when INFO is enabled
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"📋 Current prompt:\n{current_prompt}\n")
 
-        # Run session with current prompt
-        result = run_session_and_wait_for_analysis(
-            prompt=current_prompt,
-            title=f"{base_title} - Iteration {i + 1}",
-        )
+        if i == 0 and prompt_variants:
+            current_prompt, result = _run_prompt_variants(
+                [current_prompt, *prompt_variants], base_title, use_cache
+            )
+            prompt_history[0] = current_prompt
+            current_hash = _norm_hash(current_prompt)
+            seen.add(current_hash)
+        else:
+            # Run session with current prompt, unless it (or one close enough)
+            # has already been run
+            cache_key = _prompt_key(current_prompt)
+            result = None
+            if use_cache and cache_key in _PROMPT_CACHE:
+                result = _PROMPT_CACHE[cache_key][1]
+                logger.info(f"♻️ Prompt already run - reusing {result.session_id}")
+            elif similar_prompt_cache:
+                result = _find_similar_result(current_prompt, similarity_threshold)
+                if result:
+                    logger.info(
+                        f"♻️ Near-identical prompt already run - reusing {result.session_id}"
+                    )
 
-        session_ids.append(result["session_id"])
-        logger.info(f"✅ Session completed: {result['session_id']}")
+            if result is None:
+                result = SessionResult.from_task_result(
+                    run_session_and_wait_for_analysis(
+                        prompt=current_prompt,
+                        title=f"{base_title} - Iteration {i + 1}",
+                    )
+                )
+                _PROMPT_CACHE[cache_key] = (current_prompt, result)
+
+        session_ids.append(result.session_id)
+        logger.info(f"✅ Session completed: {result.session_id}")
 
         # Check for improved prompt
-        improved_prompt = result.get("suggested_prompt")
+        improved_prompt = result.suggested_prompt
+
+        # Whitespace- or case-only rewrites don't count as an improvement, and
+        # neither does going back to an earlier prompt
+        new_hash = _norm_hash(improved_prompt) if improved_prompt else current_hash
+        changed = new_hash not in seen
 
-        if improved_prompt and improved_prompt != current_prompt:
+        if changed:
             logger.info(f"💡 Improved prompt found!")
-            logger.info(f"📝 New prompt:\n{improved_prompt}\n")
-            current_prompt = improved_prompt
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"📝 New prompt:\n{improved_prompt}\n")
+            current_prompt, current_hash = improved_prompt, new_hash
+            seen.add(new_hash)
             prompt_history.append(improved_prompt)
-        else:
-            logger.info(f"⚠️ No improved prompt suggested - stopping iteration")
+
+        if resume_key:
+            _save_iteration_state(resume_key, prompt_history, session_ids)
+
+        if not changed:
+            if new_hash != current_hash:
+                logger.info(f"🔁 Suggested prompt repeats an earlier one - stopping")
+            else:
+                logger.info(f"⚠️ No improved prompt suggested - stopping iteration")
             break
 
     logger.info(f"\n🎯 Completed {len(session_ids)} iterations")
@@ -70,6 +270,87 @@ def iterate_on_prompt(
     return session_ids
 
 
+@flow(log_prints=False)
+def iterate_on_prompts_batch(
+    initial_prompts: List[str],
+    base_title: str = "Prompt Iteration",
+    iterations: int = 3,
+) -> List[List[str]]:
+    """
+    Iterate on several seed prompts at once, one round of sessions at a time.
+
+    Each round runs the current prompt of every seed still improving concurrently;
+    a seed drops out as soon as Devin suggests no further change.
+
+    Args:
+        initial_prompts: The starting prompts to iterate on
+        base_title: Base title for the sessions (will append seed and iteration)
+        iterations: Number of iterations per seed (max 10)
+
+    Returns:
+        List of session IDs per seed, in the order of initial_prompts
+    """
+    logger = get_run_logger()
+
+    capped = min(max(iterations, 0), 10)
+    if capped != iterations:
+        logger.warning(f"Iterations capped at {capped} (requested: {iterations})")
+        iterations = capped
+
+    current_prompts = list(initial_prompts)
+    current_hashes = [_norm_hash(prompt) for prompt in current_prompts]
+    seen = [{norm_hash} for norm_hash in current_hashes]
+    session_ids: List[List[str]] = [[] for _ in initial_prompts]
+    active = list(range(len(initial_prompts)))
+
+    logger.info(
+        f"🚀 Starting batch prompt iteration for {len(active)} prompts "
+        f"with {iterations} max iterations"
+    )
+
+    for i in range(iterations):
+        if not active:
+            break
+        logger.info(f"\n--- Iteration {i + 1}/{iterations} ({len(active)} prompts) ---")
+
+        # Seeds whose prompts have converged to the same text share one session
+        first_seed: Dict[bytes, int] = {}
+        for j in active:
+            first_seed.setdefault(current_hashes[j], j)
+        futures = dict(
+            zip(
+                first_seed,
+                run_session_and_wait_for_analysis.map(
+                    prompt=[current_prompts[j] for j in first_seed.values()],
+                    title=[
+                        f"{base_title} {j + 1} - Iteration {i + 1}"
+                        for j in first_seed.values()
+                    ],
+                ),
+            )
+        )
+
+        still_active = []
+        for j in active:
+            result = SessionResult.from_task_result(futures[current_hashes[j]].result())
+            session_ids[j].append(result.session_id)
+
+            improved_prompt = result.suggested_prompt
+            new_hash = _norm_hash(improved_prompt) if improved_prompt else None
+            if new_hash and new_hash not in seen[j]:
+                current_prompts[j], current_hashes[j] = improved_prompt, new_hash
+                seen[j].add(new_hash)
+                still_active.append(j)
+            else:
+                logger.info(f"⚠️ Prompt {j + 1}: no improved prompt - stopping")
+        active = still_active
+
+    logger.info(f"\n🎯 Completed batch iteration")
+    logger.info(f"📊 Session IDs: {session_ids}")
+
+    return session_ids
+
+
 if __name__ == "__main__":
     # Example usage with custom prompt and title
     custom_prompt = """
@@ -6,14 +6,22 @@ Loops through migration plan executing tasks in optimal parallel batches.
 No AI needed - just graph analysis and smart scheduling.
 """
 
+import atexit
 import os
+import re
 import sys
 import time
+import random
+import types
+import hashlib
 import httpx
+from collections import defaultdict, deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dotenv import load_dotenv
 from prefect import flow, task
+from prefect.futures import as_completed
 from prefect.logging import get_run_logger
 
 # Load environment variables
@@ -21,8 +29,43 @@ load_dotenv()
 
 # Add parent to path
 sys.path.append(str(Path(__file__).parent.parent))
-from src.tasks.run_sessions import run_session_and_wait_for_pr, get_enterprise_session_data
+from src.tasks.run_sessions import run_session_and_wait_for_pr, get_enterprise_session_data_bulk, MAX_POLL_INTERVAL
 from src.utils.parallel_detector import ParallelDetector, analyze_tasks
+from src.utils.critical_path import compute_cp
+
+# Plans already loaded, keyed by source path/URL -> (version, plan). The version
+# is the file mtime for local plans and (ETag, SHA-256 of the source) for remote
+# ones, so an unchanged plan is returned without re-executing it.
+_PLAN_CACHE: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+
+# Prompt templates, read once at import so a missing file fails fast
+_PROMPTS_DIR = Path(__file__).parent / "prompts"
+_MERGE_CONFLICT_PROMPT = (_PROMPTS_DIR / "merge_conflict_resolution.md").read_text()
+_PHASE11_PROMPT = (_PROMPTS_DIR / "phases_initial_graph_creation" / "phase11_completion_verification.md").read_text()
+
+# Session ID at the end of a Devin session URL (ignores any query string/fragment)
+_SESSION_ID_RE = re.compile(r"/sessions/([^/?#]+)")
+
+
+def _session_id(url: Optional[str]) -> Optional[str]:
+    """Extract the session ID from a session URL, or None if it isn't one."""
+    m = _SESSION_ID_RE.search(url or "")
+    return m.group(1) if m else None
+
+
+# [PLACEHOLDER] tokens used in the prompt templates
+_PLACEHOLDER_RE = re.compile(r"\[([A-Z_]+)\]")
+
+
+def _fill_template(template: str, **values: str) -> str:
+    """Substitute [NAME] placeholders in one pass; unknown tokens are left as-is."""
+    return _PLACEHOLDER_RE.sub(lambda m: values.get(m.group(1), m.group(0)), template)
+
+
+# Shared client for plan fetches so repeated iterations reuse one HTTP/2
+# connection to GitHub instead of a fresh TLS handshake each time
+_github_client = httpx.Client(http2=True, timeout=httpx.Timeout(30.0, connect=5.0))
+atexit.register(_github_client.close)
 
 
 def load_migration_plan() -> Dict[str, Any]:
@@ -32,11 +75,17 @@ def load_migration_plan() -> Dict[str, Any]:
     if not plan_path.exists():
         raise FileNotFoundError(f"No migration plan found at: {plan_path}")
     
+    mtime = plan_path.stat().st_mtime_ns
+    cached = _PLAN_CACHE.get(str(plan_path))
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
     import importlib.util
     spec = importlib.util.spec_from_file_location("migration_plan", plan_path)
     module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(module)
     
+    _PLAN_CACHE[str(plan_path)] = (mtime, module.migration_plan)
     return module.migration_plan
 
 
@@ -54,22 +103,35 @@ def fetch_migration_plan_from_github(
     
     logger.info(f"📥 Fetching migration plan from GitHub: {raw_url}")
     
+    # Ask GitHub to skip the body if the plan hasn't changed since the last fetch
+    cached = _PLAN_CACHE.get(raw_url)
+    headers = {"If-None-Match": cached[0][0]} if cached and cached[0][0] else {}
+    
     try:
-        # Download the file content (no timeout - be patient)
-        with httpx.Client(timeout=None) as client:
-            response = client.get(raw_url)
+        # Download the file content, hashing it as it arrives
+        digest = hashlib.sha256()
+        chunks = []
+        with _github_client.stream("GET", raw_url, headers=headers) as response:
+            if cached and response.status_code == 304:
+                logger.info("✅ Migration plan unchanged on GitHub, reusing loaded plan")
+                return cached[1]
             response.raise_for_status()
-            content = response.text
+            for chunk in response.iter_bytes():
+                digest.update(chunk)
+                chunks.append(chunk)
+            etag = response.headers.get("etag")
+        
+        # Same source as the plan we already have - no need to execute it again
+        if cached and cached[0][1] == digest.hexdigest():
+            _PLAN_CACHE[raw_url] = ((etag, cached[0][1]), cached[1])
+            logger.info("✅ Migration plan unchanged on GitHub, reusing loaded plan")
+            return cached[1]
         
-        # Save to local temp file
-        temp_path = Path(__file__).parent.parent / "migration_plan_remote.py"
-        temp_path.write_text(content)
+        # Load the plan straight from the downloaded source (no temp file on disk)
+        module = types.ModuleType("migration_plan_remote")
+        exec(compile(b"".join(chunks), raw_url, "exec"), module.__dict__)
         
-        # Load the plan
-        import importlib.util
-        spec = importlib.util.spec_from_file_location("migration_plan_remote", temp_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        _PLAN_CACHE[raw_url] = ((etag, digest.hexdigest()), module.migration_plan)
         
         logger.info("✅ Successfully fetched and loaded migration plan from GitHub")
         return module.migration_plan
@@ -89,6 +151,10 @@ def wait_for_prs_to_merge(
 ) -> bool:
     """Wait for all PRs from the given sessions to be merged.
     
+    Checks start every poll_interval seconds and back off (with jitter) while no
+    PR changes state, up to MAX_POLL_INTERVAL (or poll_interval, if larger) so a
+    merge is noticed within about a minute; any merge or close resets the interval.
+    
     Returns:
         True if all PRs are merged, False if timeout
     """
@@ -98,8 +164,8 @@ def wait_for_prs_to_merge(
     if not api_key:
         raise ValueError("DEVIN_API_KEY environment variable not set")
     
-    # Collect all PR info from sessions
-    pr_tracking = []  # List of (session_id, pr_url, is_merged)
+    # Collect all PR info from sessions, grouped so each session is queried once
+    pr_tracking: Dict[str, Dict[str, Dict[str, bool]]] = defaultdict(dict)  # session_id -> pr_url -> state
     
     for result in session_results:
         session_id = result.get("session_id")
@@ -108,49 +174,61 @@ def wait_for_prs_to_merge(
             
         if result.get("prs"):
             for pr in result["prs"]:
-                pr_tracking.append({
-                    "session_id": session_id,
-                    "pr_url": pr.get("pr_url"),
-                    "merged": False
-                })
+                pr_tracking[session_id][pr.get("pr_url")] = {"merged": False}
     
-    if not pr_tracking:
+    total_prs = sum(len(tracked) for tracked in pr_tracking.values())
+    if not total_prs:
         logger.info("📭 No PRs to wait for")
         return True
     
-    logger.info(f"⏳ Waiting for {len(pr_tracking)} PR(s) to be merged...")
-    for pr in pr_tracking:
-        logger.info(f"   • {pr['pr_url']}")
+    logger.info(f"⏳ Waiting for {total_prs} PR(s) to be merged...")
+    for tracked in pr_tracking.values():
+        for pr_url in tracked:
+            logger.info(f"   • {pr_url}")
     
-    start_time = time.time()
+    start_time = time.monotonic()
     max_wait_seconds = max_wait_minutes * 60
+    max_interval = max(poll_interval, MAX_POLL_INTERVAL)
+    interval = poll_interval
     
     while True:
         # Check each PR status
         all_merged = True
+        any_changed = False
+        
+        # Get latest session data for every session with unmerged PRs at once
+        pending = [
+            session_id for session_id, tracked in pr_tracking.items()
+            if not all(pr_state["merged"] for pr_state in tracked.values())
+        ]
+        session_data_by_id = get_enterprise_session_data_bulk(api_key, pending)
         
-        for pr_info in pr_tracking:
-            if pr_info["merged"]:
-                continue  # Already merged
+        for session_id in pending:
+            tracked = pr_tracking[session_id]
+            session_data = session_data_by_id.get(session_id)
+            if session_data is None:
+                # Lookup failed (already logged) - check again next time
+                all_merged = False
+                continue
             
-            # Get latest session data
             try:
-                session_data = get_enterprise_session_data(api_key, pr_info["session_id"])
-                prs = session_data.get("prs", [])
-                
-                # Find the PR and check its state
-                for pr in prs:
-                    if pr.get("pr_url") == pr_info["pr_url"]:
-                        state = pr.get("state", "").lower()
-                        if state == "merged":
-                            pr_info["merged"] = True
-                            logger.info(f"   ✅ PR merged: {pr_info['pr_url']}")
-                        elif state == "closed":
-                            logger.warning(f"   ⚠️ PR closed without merging: {pr_info['pr_url']}")
-                            pr_info["merged"] = True  # Consider it "done"
-                        else:
-                            all_merged = False
-                        break
+                # Update every tracked PR of this session and check its state
+                for pr in session_data.get("prs", []):
+                    pr_url = pr.get("pr_url")
+                    pr_state = tracked.get(pr_url)
+                    if pr_state is None or pr_state["merged"]:
+                        continue
+                    state = pr.get("state", "").lower()
+                    if state == "merged":
+                        pr_state["merged"] = True
+                        any_changed = True
+                        logger.info(f"   ✅ PR merged: {pr_url}")
+                    elif state == "closed":
+                        logger.warning(f"   ⚠️ PR closed without merging: {pr_url}")
+                        pr_state["merged"] = True  # Consider it "done"
+                        any_changed = True
+                    else:
+                        all_merged = False
                         
             except Exception as e:
                 logger.warning(f"   ⚠️ Failed to check PR status: {e}")
@@ -161,56 +239,129 @@ def wait_for_prs_to_merge(
             return True
         
         # Check timeout
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         if elapsed >= max_wait_seconds:
             logger.warning(f"⏱️ Timeout after {max_wait_minutes} minutes")
-            unmerged = [pr['pr_url'] for pr in pr_tracking if not pr["merged"]]
+            unmerged = [
+                pr_url for tracked in pr_tracking.values()
+                for pr_url, pr_state in tracked.items() if not pr_state["merged"]
+            ]
             if unmerged:
                 logger.warning(f"   Unmerged PRs: {', '.join(unmerged)}")
             return False
         
         # Show progress
-        merged_count = sum(1 for pr in pr_tracking if pr["merged"])
+        merged_count = sum(
+            1 for tracked in pr_tracking.values() for pr_state in tracked.values() if pr_state["merged"]
+        )
         wait_minutes = int(elapsed / 60)
-        logger.info(f"   Progress: {merged_count}/{len(pr_tracking)} merged (waiting {wait_minutes} minutes)")
+        logger.info(f"   Progress: {merged_count}/{total_prs} merged (waiting {wait_minutes} minutes)")
         
-        # Wait before next check
-        time.sleep(poll_interval)
+        # Wait before next check - back off while nothing changes, never past the deadline
+        if any_changed:
+            interval = poll_interval
+        time.sleep(min(interval * random.uniform(0.9, 1.1), max_wait_seconds - elapsed))
+        interval = min(interval * 1.5, max_interval)
 
 
-def find_ready_tasks(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+class PlanIndex:
     """
-    Find all not-complete tasks with satisfied dependencies.
+    Dependency index over a plan's tasks for incremental ready-task discovery.
     
-    Returns:
-        List of task dictionaries that are ready to run
+    Built once per plan (O(tasks + dependencies)); afterwards completing a task
+    only touches its dependents, and tasks whose last open dependency closes are
+    pushed onto the ready queue.
     """
-    tasks = plan.get("tasks", [])
     
-    # Build status map for quick lookup
-    status_map = {t["id"]: t.get("status", "not-complete") for t in tasks}
+    def __init__(self, tasks: List[Dict[str, Any]]):
+        self._build(tasks)
     
-    ready = []
-    for task in tasks:
-        # Skip completed tasks
-        if task.get("status") == "complete":
-            continue
+    def _build(self, tasks: List[Dict[str, Any]]) -> None:
+        self.tasks = {t["id"]: t for t in tasks}
+        self.order = {task_id: i for i, task_id in enumerate(self.tasks)}
+        self.complete = {t["id"] for t in tasks if t.get("status") == "complete"}
+        self.dependents: Dict[str, List[str]] = defaultdict(list)
+        self.remaining_deps: Dict[str, int] = {}
+        self.ready_queue: deque = deque()
         
-        # Check if all dependencies are complete
-        deps = task.get("depends_on", [])
-        if all(status_map.get(dep) == "complete" for dep in deps):
-            ready.append(task)
+        for task in tasks:
+            deps = task.get("depends_on", [])
+            for dep in deps:
+                self.dependents[dep].append(task["id"])
+            # Unknown dependencies are never satisfied, same as incomplete ones
+            self.remaining_deps[task["id"]] = sum(1 for dep in deps if dep not in self.complete)
+            if task["id"] not in self.complete and self.remaining_deps[task["id"]] == 0:
+                self.ready_queue.append(task["id"])
+    
+    def mark_complete(self, task_id: str) -> None:
+        """Record a task as complete and release any dependents it unblocks."""
+        if task_id in self.complete:
+            return
+        self.complete.add(task_id)
+        if task_id in self.ready_queue:
+            self.ready_queue.remove(task_id)
+        for dependent in self.dependents.get(task_id, []):
+            self.remaining_deps[dependent] -= 1
+            if self.remaining_deps[dependent] == 0 and dependent not in self.complete:
+                self.ready_queue.append(dependent)
+    
+    def reconcile(self, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Bring the index up to date with a freshly loaded plan.
+        
+        Newly completed tasks are applied incrementally. If tasks were added or
+        removed, dependencies changed, or a task went back to not-complete, the
+        index is rebuilt from scratch.
+        """
+        by_id = {t["id"]: t for t in tasks}
+        rebuild = by_id.keys() != self.tasks.keys() or any(
+            t.get("depends_on", []) != self.tasks[t["id"]].get("depends_on", [])
+            or (t["id"] in self.complete and t.get("status") != "complete")
+            for t in tasks
+        )
+        if rebuild:
+            self._build(tasks)
+            return
+        
+        self.tasks = by_id
+        for task in tasks:
+            if task.get("status") == "complete":
+                self.mark_complete(task["id"])
     
-    return ready
+    def ready_tasks(self) -> List[Dict[str, Any]]:
+        """Ready tasks in plan order."""
+        return [self.tasks[task_id] for task_id in sorted(self.ready_queue, key=self.order.__getitem__)]
 
 
-def select_parallel_batch(ready_tasks: List[Dict[str, Any]], max_parallel: Optional[int] = None) -> List[Dict[str, Any]]:
+def find_ready_tasks(plan: Dict[str, Any], index: Optional[PlanIndex] = None) -> List[Dict[str, Any]]:
+    """
+    Find all not-complete tasks with satisfied dependencies.
+    
+    Args:
+        plan: Migration plan
+        index: PlanIndex kept in sync with this plan (built on the fly if omitted)
+    
+    Returns:
+        List of task dictionaries that are ready to run
+    """
+    if index is None:
+        index = PlanIndex(plan.get("tasks", []))
+    return index.ready_tasks()
+
+
+def select_parallel_batch(
+    ready_tasks: List[Dict[str, Any]], 
+    max_parallel: Optional[int] = None,
+    cp: Optional[Dict[str, float]] = None
+) -> List[Dict[str, Any]]:
     """
     Use ParallelDetector to find optimal batch of tasks to run together.
     
     Args:
         ready_tasks: All tasks that are ready to run
         max_parallel: Maximum number of parallel sessions (None = no limit)
+        cp: Critical-path weights from compute_cp; when given, tasks on the
+            longest remaining chain are picked first under max_parallel
     
     Returns:
         Optimal batch of tasks to run in parallel
@@ -221,19 +372,13 @@ def select_parallel_batch(ready_tasks: List[Dict[str, Any]], max_parallel: Optio
     if len(ready_tasks) == 1:
         return ready_tasks
     
-    # Use ParallelDetector to find truly independent tasks
-    detector = ParallelDetector(ready_tasks)
-    parallel_groups = detector.detect_parallel_groups()
+    # Selection only depends on the ready tasks' IDs and dependencies (plus the
+    # limit and priorities), so unchanged inputs reuse the previous answer
+    task_key = tuple((t["id"], tuple(t.get("depends_on", []))) for t in ready_tasks)
+    cp_key = tuple(cp.get(t["id"], 0) for t in ready_tasks) if cp else None
+    selected_ids = _select_batch_ids(task_key, max_parallel, cp_key)
     
-    if parallel_groups:
-        # Take the first parallel group (all at same level, no interdependencies)
-        first_group = parallel_groups[0]
-        if max_parallel is None:
-            # No limit - take all tasks in the group
-            selected_ids = first_group.task_ids
-        else:
-            # Apply limit
-            selected_ids = first_group.task_ids[:max_parallel]
+    if selected_ids is not None:
         return [t for t in ready_tasks if t["id"] in selected_ids]
     else:
         # No parallel opportunities found - tasks have dependencies on each other
@@ -241,16 +386,51 @@ def select_parallel_batch(ready_tasks: List[Dict[str, Any]], max_parallel: Optio
         return ready_tasks[:1]
 
 
-def create_task_prompt(task: Dict[str, Any], parallel_context: List[Dict[str, Any]]) -> str:
-    """Create prompt for a task with context about parallel execution."""
+@lru_cache(maxsize=64)
+def _select_batch_ids(
+    task_key: Tuple[Tuple[str, Tuple[str, ...]], ...],
+    max_parallel: Optional[int],
+    cp_key: Optional[Tuple[float, ...]]
+) -> Optional[frozenset]:
+    """Pick the batch for select_parallel_batch; None if nothing can run in parallel."""
+    # Use ParallelDetector to find truly independent tasks
+    detector = ParallelDetector([{"id": task_id, "depends_on": list(deps)} for task_id, deps in task_key])
+    parallel_groups = detector.detect_parallel_groups()
+    
+    if not parallel_groups:
+        return None
+    
+    # Take the first parallel group (all at same level, no interdependencies)
+    first_group = parallel_groups[0]
+    if max_parallel is None:
+        # No limit - take all tasks in the group
+        return frozenset(first_group.task_ids)
+    
+    # Apply limit, keeping the tasks with the most work behind them
+    group_ids = first_group.task_ids
+    if cp_key:
+        cp = {task_id: weight for (task_id, _), weight in zip(task_key, cp_key)}
+        group_ids = sorted(group_ids, key=lambda task_id: -cp[task_id])
+    return frozenset(group_ids[:max_parallel])
+
+
+def create_task_prompt(
+    task: Dict[str, Any], 
+    parallel_context: List[Dict[str, Any]],
+    parallel_lines: Optional[List[str]] = None
+) -> str:
+    """Create prompt for a task with context about parallel execution.
+    
+    parallel_lines are the already formatted "• id: title" lines for the other
+    tasks in the batch; they're built from parallel_context when omitted.
+    """
     
     # Build context about other parallel tasks
-    other_tasks = [t for t in parallel_context if t['id'] != task['id']]
+    if parallel_lines is None:
+        parallel_lines = [f"• {t['id']}: {t['title']}" for t in parallel_context if t['id'] != task['id']]
     parallel_info = ""
-    if other_tasks:
-        parallel_info = f"\n## ⚡ Running in Parallel With:\n"
-        for t in other_tasks:
-            parallel_info += f"• {t['id']}: {t['title']}\n"
+    if parallel_lines:
+        parallel_info = "\n## ⚡ Running in Parallel With:\n" + "\n".join(parallel_lines) + "\n"
         parallel_info += "\nAvoid file conflicts with parallel tasks.\n"
     
     return f"""
@@ -281,6 +461,15 @@ def create_task_prompt(task: Dict[str, Any], parallel_context: List[Dict[str, An
 """
 
 
+def create_batch_prompts(batch: List[Dict[str, Any]]) -> List[str]:
+    """Create prompts for every task in a batch, formatting each task's line once."""
+    lines = [f"• {t['id']}: {t['title']}" for t in batch]
+    return [
+        create_task_prompt(task, batch, lines[:i] + lines[i + 1:])
+        for i, task in enumerate(batch)
+    ]
+
+
 @task(name="Execute Task")
 def execute_task(task_dict: Dict[str, Any], prompt: str) -> Dict[str, Any]:
     """Execute a single task via Devin session."""
@@ -298,7 +487,7 @@ def execute_task(task_dict: Dict[str, Any], prompt: str) -> Dict[str, Any]:
     
     # Extract session ID from URL
     session_url = result.get('session_url', '')
-    session_id = session_url.split('/')[-1] if '/sessions/' in session_url else None
+    session_id = _session_id(session_url)
     
     return {
         "task_id": task_dict['id'],
@@ -325,12 +514,12 @@ def run_pr_compatibility_check(batch_results: List[Dict[str, Any]]) -> Optional[
         logger.info("ℹ️ No PRs found in batch results, skipping compatibility check")
         return None
     
-    prompt_path = Path(__file__).parent / "prompts" / "merge_conflict_resolution.md"
-    prompt_template = prompt_path.read_text()
-    
     # Replace placeholders
-    prompt = prompt_template.replace("[TARGET_REPO]", "target-springboot-cics")
-    prompt = prompt.replace("[PR_LIST]", "\n".join(pr_list))
+    prompt = _fill_template(
+        _MERGE_CONFLICT_PROMPT,
+        TARGET_REPO="target-springboot-cics",
+        PR_LIST="\n".join(pr_list)
+    )
     
     # Add repository context at the end
     prompt += "\n\n## Repository Context\n**Primary Focus - Target Repository**: taylor-curran/target-springboot-cics\nThis is where all merge conflicts should be resolved and where the migrated code lives.\n\n**Context - Source Repository**: taylor-curran/og-cics-cobol-app\nThis is the original COBOL CICS application being migrated from (for reference only)."
@@ -348,7 +537,7 @@ def run_pr_compatibility_check(batch_results: List[Dict[str, Any]]) -> Optional[
     
     # Extract session ID
     session_url = result.get('session_url', '')
-    session_id = session_url.split('/')[-1] if '/sessions/' in session_url else None
+    session_id = _session_id(session_url)
     
     return {
         "task_id": "pr_compatibility_check",
@@ -363,13 +552,12 @@ def run_phase11_verification() -> Dict[str, Any]:
     """Run phase 11 to verify completion status of all tasks."""
     logger = get_run_logger()
     
-    # Load phase 11 prompt
-    prompt_path = Path(__file__).parent / "prompts" / "phases_initial_graph_creation" / "phase11_completion_verification.md"
-    prompt_template = prompt_path.read_text()
-    
     # Replace placeholders
-    prompt = prompt_template.replace("[SOURCE_REPO]", "legacy-cobol-cics")
-    prompt = prompt_template.replace("[TARGET_REPO]", "target-springboot-cics")
+    prompt = _fill_template(
+        _PHASE11_PROMPT,
+        SOURCE_REPO="legacy-cobol-cics",
+        TARGET_REPO="target-springboot-cics"
+    )
     
     # Add repository context at the end
     prompt += "\n\n## Repository Context\n**Target Repository**: taylor-curran/target-springboot-cics\n**Source Repository**: taylor-curran/og-cics-cobol-app"
@@ -387,7 +575,7 @@ def run_phase11_verification() -> Dict[str, Any]:
     
     # Extract session ID  
     session_url = result.get('session_url', '')
-    session_id = session_url.split('/')[-1] if '/sessions/' in session_url else None
+    session_id = _session_id(session_url)
     
     return {
         "task_id": "phase11_verification",
@@ -424,6 +612,7 @@ def orchestrate_migration(
     
     all_results = []
     iteration = 0
+    plan_index = None
     
     while True:
         iteration += 1
@@ -447,9 +636,15 @@ def orchestrate_migration(
             plan = load_migration_plan()
         tasks = plan.get("tasks", [])
         
+        # Bring the dependency index up to date; it also tracks completed tasks
+        if plan_index is None:
+            plan_index = PlanIndex(tasks)
+        else:
+            plan_index.reconcile(tasks)
+        
         # Calculate progress
         total_tasks = len(tasks)
-        completed_tasks = sum(1 for t in tasks if t.get("status") == "complete")
+        completed_tasks = len(plan_index.complete)
         logger.info(f"📊 Progress: {completed_tasks}/{total_tasks} tasks complete ({completed_tasks*100//total_tasks}%)")
         
         # Check if we're done
@@ -459,63 +654,79 @@ def orchestrate_migration(
         
         # Step 2: Find ready tasks
         logger.info("\n🔍 Finding ready tasks...")
-        ready_tasks = find_ready_tasks(plan)
+        ready_tasks = find_ready_tasks(plan, plan_index)
         
         if not ready_tasks:
             logger.warning("⚠️ No tasks ready to run!")
             
             # Analyze why we're blocked
-            blocked_tasks = [t for t in tasks if t.get("status") != "complete"]
-            logger.info(f"\n🔒 Blocked tasks ({len(blocked_tasks)} remaining):")
+            blocked_tasks = [t for t in tasks if t["id"] not in plan_index.complete]
             
             # Group by reason
+            incomplete_ids = {t["id"] for t in blocked_tasks}
             waiting_for_deps = []
             for task in blocked_tasks:
                 deps = task.get("depends_on", [])
-                incomplete_deps = [d for d in deps if any(t["id"] == d and t.get("status") != "complete" for t in tasks)]
+                incomplete_deps = [d for d in deps if d in incomplete_ids]
                 if incomplete_deps:
                     waiting_for_deps.append((task, incomplete_deps))
             
-            # Show blocked tasks
-            for task, incomplete_deps in waiting_for_deps[:5]:
-                logger.info(f"   • {task['id']}: Blocked by → {', '.join(incomplete_deps)}")
+            # Show blocked tasks (one log record for the whole diagnostic)
+            lines = [f"\n🔒 Blocked tasks ({len(blocked_tasks)} remaining):"]
+            lines += [
+                f"   • {task['id']}: Blocked by → {', '.join(incomplete_deps)}"
+                for task, incomplete_deps in waiting_for_deps[:5]
+            ]
             if len(waiting_for_deps) > 5:
-                logger.info(f"   ... and {len(waiting_for_deps)-5} more blocked tasks")
-            
-            logger.info("\n💡 Next steps:")
-            logger.info("   1. Check if PRs from previous batch need merging")
-            logger.info("   2. Verify no circular dependencies exist") 
-            logger.info("   3. Run 'python src/utils/validate_graph.py' to check plan validity")
+                lines.append(f"   ... and {len(waiting_for_deps)-5} more blocked tasks")
+            lines += [
+                "\n💡 Next steps:",
+                "   1. Check if PRs from previous batch need merging",
+                "   2. Verify no circular dependencies exist",
+                "   3. Run 'python src/utils/validate_graph.py' to check plan validity"
+            ]
+            logger.info("\n".join(lines))
             break
         
         logger.info(f"✅ Found {len(ready_tasks)} ready tasks")
         
         # Show which tasks are ready
         if len(ready_tasks) <= 5:
-            logger.info("📋 Ready tasks (all dependencies satisfied):")
-            for task in ready_tasks:
-                deps_info = f" (deps: {', '.join(task.get('depends_on', [])) or 'none'})"
-                logger.info(f"   • {task['id']}: {task['title']}{deps_info}")
+            lines = ["📋 Ready tasks (all dependencies satisfied):"]
+            lines += [
+                f"   • {task['id']}: {task['title']} (deps: {', '.join(task.get('depends_on', [])) or 'none'})"
+                for task in ready_tasks
+            ]
+            logger.info("\n".join(lines))
         else:
             logger.info(f"📋 Ready tasks: {', '.join([t['id'] for t in ready_tasks[:5]])} ... and {len(ready_tasks)-5} more")
         
         # Step 3: Select optimal parallel batch
         limit_msg = "no limit" if max_parallel is None else f"max {max_parallel}"
         logger.info(f"\n🧮 Selecting parallel batch ({limit_msg})...")
-        batch = select_parallel_batch(ready_tasks, max_parallel)
+        try:
+            cp = compute_cp(tasks)
+        except ValueError as e:
+            logger.warning(f"Could not compute critical path priorities: {e}")
+            cp = None
+        batch = select_parallel_batch(ready_tasks, max_parallel, cp)
         logger.info(f"📦 Selected {len(batch)} tasks for parallel execution:")
         
         for task in batch:
             logger.info(f"   ✓ {task['id']}: {task['title']}")
         
         # If some ready tasks weren't selected, explain why
-        not_selected = [t for t in ready_tasks if t not in batch]
+        batch_ids = {t["id"] for t in batch}
+        not_selected = [t for t in ready_tasks if t["id"] not in batch_ids]
         if not_selected:
-            logger.info(f"\n⏸️ Not selected ({len(not_selected)} tasks):")
-            for task in not_selected[:3]:  # Show first 3
-                logger.info(f"   • {task['id']} - would conflict with selected tasks or exceeds parallel limit")
+            lines = [f"\n⏸️ Not selected ({len(not_selected)} tasks):"]
+            lines += [
+                f"   • {task['id']} - would conflict with selected tasks or exceeds parallel limit"
+                for task in not_selected[:3]  # Show first 3
+            ]
             if len(not_selected) > 3:
-                logger.info(f"   ... and {len(not_selected)-3} more")
+                lines.append(f"   ... and {len(not_selected)-3} more")
+            logger.info("\n".join(lines))
         
         # Show efficiency if multiple tasks
         if len(batch) > 1:
@@ -557,7 +768,7 @@ def orchestrate_migration(
             logger.info(f"\n🚀 Executing {len(batch)} tasks in parallel...")
             
             # Create prompts with parallel context
-            prompts = [create_task_prompt(task, batch) for task in batch]
+            prompts = create_batch_prompts(batch)
             
             # Submit all tasks for parallel execution
             futures = []
@@ -565,17 +776,19 @@ def orchestrate_migration(
                 future = execute_task.submit(task, prompt)
                 futures.append(future)
             
-            # Wait for all to complete
-            batch_results = [f.result() for f in futures]
-            all_results.extend(batch_results)
-            
-            # Show results
+            # Show each result as soon as its session finishes rather than after the
+            # slowest one; results are still kept in batch order
+            positions = {future: i for i, future in enumerate(futures)}
+            batch_results = [None] * len(futures)
             logger.info("\n📊 Batch Results:")
-            for result in batch_results:
+            for future in as_completed(futures):
+                result = future.result()
+                batch_results[positions[future]] = result
                 logger.info(f"   • {result['task_id']}: {result['session_url']}")
                 if result.get('prs'):
                     for pr in result['prs']:
                         logger.info(f"     PR: {pr.get('pr_url', 'Unknown URL')}")
+            all_results.extend(batch_results)
             
             # Step 5: Always run PR compatibility check after parallel batch
             logger.info("\n🔍 Running PR compatibility and integration check...")
@@ -698,13 +911,19 @@ def run_single_batch(max_parallel: Optional[int] = None) -> Dict[str, Any]:
         logger.info(f"   • {task['id']}: {task['title']}")
     
     # Execute
-    prompts = [create_task_prompt(task, batch) for task in batch]
+    prompts = create_batch_prompts(batch)
     futures = []
     for task, prompt in zip(batch, prompts):
         future = execute_task.submit(task, prompt)
         futures.append(future)
     
-    results = [f.result() for f in futures]
+    # Report each task as it finishes, keeping results in batch order
+    positions = {future: i for i, future in enumerate(futures)}
+    results = [None] * len(futures)
+    for future in as_completed(futures):
+        result = future.result()
+        results[positions[future]] = result
+        logger.info(f"   ✓ Finished {result['task_id']}")
     
     # Summary
     logger.info("\n✅ Batch Complete!")
@@ -15,38 +15,159 @@ Phase 2 - Analysis Generation (generate_analysis):
   4. Create artifacts (timeline, improvements, quick stats, structured output)
 """
 
+import atexit
 import os
+import random
 import time
+import threading
 import httpx
 import json
-from typing import Dict, Any, Optional
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
 from dotenv import load_dotenv
 from prefect import task
 from prefect.logging import get_run_logger
 import sys
 from pathlib import Path
 
-sys.path.append(str(Path(__file__).parent.parent))
-from utils.artifacts import (
-    create_session_link_artifact,
-    create_timeline_artifact,
-    create_improvements_artifact,
-    create_session_quick_stats_artifact,
-    create_structured_output_artifact,
-    create_pr_artifact,
-)
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:  # orjson is optional; the stdlib codec works the same
+    from json import dumps as json_dumps, loads as json_loads
+
+# Resolve utils from the same package tree when imported as src.tasks.run_sessions,
+# so it isn't loaded a second time as a top-level package
+try:
+    from ..utils.artifacts import (
+        create_session_link_artifact,
+        create_timeline_artifact,
+        create_improvements_artifact,
+        create_session_quick_stats_artifact,
+        create_structured_output_artifact,
+        create_pr_artifact,
+    )
+except ImportError:
+    # Run as a script or imported as top-level `tasks`: utils lives under src/
+    _src_dir = str(Path(__file__).parent.parent)
+    if _src_dir not in sys.path:
+        sys.path.append(_src_dir)
+    from utils.artifacts import (
+        create_session_link_artifact,
+        create_timeline_artifact,
+        create_improvements_artifact,
+        create_session_quick_stats_artifact,
+        create_structured_output_artifact,
+        create_pr_artifact,
+    )
 
 load_dotenv()
 
 # Default poll interval (in seconds)
 DEFAULT_POLL_INTERVAL = 10  # Check every 10 seconds
 
+# Polls start this fast and back off while nothing changes, so quick
+# transitions are seen without polling slow sessions harder. Long stretches
+# without a change (e.g. the working phase) back off up to MAX_POLL_INTERVAL.
+MIN_POLL_INTERVAL = 1.0
+POLL_BACKOFF = 1.5
+MAX_POLL_INTERVAL = 60.0
+# Each wait is stretched or shrunk by up to this fraction, so sessions started
+# together don't keep polling in lockstep
+POLL_JITTER = 0.1
+
+# Session creations allowed per minute, shared by every task in the process
+SESSION_CREATES_PER_MINUTE = 10
+
+# Upper bound on concurrent enterprise session lookups in a bulk fetch
+BULK_FETCH_WORKERS = 8
+
+
+class _RateLimiter:
+    """Spaces out calls so at most max_rate start in any time_period seconds."""
+
+    def __init__(self, max_rate: int, time_period: float = 60.0):
+        self.interval = time_period / max_rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the caller's slot comes up."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+_SESSION_LIMITER = _RateLimiter(SESSION_CREATES_PER_MINUTE)
+
+
+# httpx drops idle connections after 5s by default, shorter than almost any
+# gap between polls. Keep them past the longest backed-off poll so each poll
+# reuses its connection instead of doing a new TCP+TLS handshake.
+_CLIENT_LIMITS = httpx.Limits(
+    max_keepalive_connections=32,
+    max_connections=64,
+    keepalive_expiry=MAX_POLL_INTERVAL + 30,
+)
+
+
+def _new_client() -> httpx.Client:
+    """Create an HTTP/2 client for Devin API calls."""
+    # No timeout - the Devin API can be slow, be patient
+    return httpx.Client(http2=True, timeout=None, limits=_CLIENT_LIMITS)
+
+
+# Pooled client for API calls made outside a task run (e.g. the
+# orchestrator's bulk PR polling), kept alive for the life of the process
+_SHARED_CLIENT = _new_client()
+atexit.register(_SHARED_CLIENT.close)
+
+
+@lru_cache(maxsize=8)
+def _auth_headers(api_key: str) -> Mapping[str, str]:
+    """Authorization header for api_key, built once and shared by every poll (read-only)."""
+    return MappingProxyType({"Authorization": f"Bearer {api_key}"})
+
+
+def _retry_after(response: httpx.Response, default: float) -> float:
+    """Seconds to wait before retrying, from the Retry-After header when the API sends one.
+
+    The header value is clamped to [0, MAX_POLL_INTERVAL] so a bogus value can't
+    make time.sleep raise or stall the task.
+    """
+    try:
+        retry_after = float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        # Missing, or an HTTP date rather than a number of seconds
+        return default
+    if not math.isfinite(retry_after):
+        return default
+    return min(max(retry_after, 0.0), MAX_POLL_INTERVAL)
+
+
+def _client_or_shared(client: Optional[httpx.Client]) -> httpx.Client:
+    """Return the caller's client if given, else the process-wide shared client.
+
+    Tasks open one client for their whole run and pass it down, so every poll
+    reuses the same connection instead of paying a new TCP+TLS handshake.
+    """
+    return client if client is not None else _SHARED_CLIENT
+
 
 def create_session(
     api_key: str,
     prompt: str,
     title: Optional[str] = None,
     structured_output_schema: Optional[Dict[str, Any]] = None,
+    *,
+    client: Optional[httpx.Client] = None,
 ) -> str:
     """Create a new Devin session and return session_id.
 
@@ -55,6 +176,7 @@ def create_session(
         prompt: The task prompt for Devin
         title: Optional session title
         structured_output_schema: Optional schema fields to add directly to request body
+        client: Optional shared HTTP client to send the request on
 
     Returns:
         Session ID
@@ -62,7 +184,7 @@ def create_session(
     logger = get_run_logger()
 
     url = "https://api.devin.ai/v1/sessions"
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    headers = {**_auth_headers(api_key), "Content-Type": "application/json"}
 
     data = {
         "prompt": prompt,
@@ -77,10 +199,25 @@ def create_session(
             f"Added schema fields to request: {list(structured_output_schema.keys())}"
         )
 
+    # Encode once - the prompt and schema can be large, and retries resend the same body
+    body = json_dumps(data)
+
     # No timeout - let session creation take as long as needed
-    with httpx.Client(timeout=None) as client:
-        response = client.post(url, headers=headers, json=data)
-        response.raise_for_status()
+    max_retries = 3
+    http = _client_or_shared(client)
+    for attempt in range(max_retries):
+        _SESSION_LIMITER.acquire()
+        response = http.post(url, headers=headers, content=body)
+        if response.status_code != 429 or attempt == max_retries - 1:
+            break
+        # Rate limited - wait as long as the API asks before retrying
+        retry_after = _retry_after(response, 60)
+        logger.warning(
+            f"   Rate limited creating session, retrying in {retry_after:.0f}s "
+            f"(attempt {attempt+1}/{max_retries})"
+        )
+        time.sleep(retry_after)
+    response.raise_for_status()
 
     result = response.json()
     session_id = result["session_id"]
@@ -93,14 +230,12 @@ def create_session(
     return session_id
 
 
-def get_session_status(api_key: str, session_id: str) -> Dict[str, Any]:
+def get_session_status(
+    api_key: str, session_id: str, *, client: Optional[httpx.Client] = None
+) -> Dict[str, Any]:
     """Get current session details including status with retry logic for server errors."""
-    from prefect.logging import get_run_logger
-    import time
-    
-    logger = get_run_logger()
     url = f"https://api.devin.ai/v1/sessions/{session_id}"
-    headers = {"Authorization": f"Bearer {api_key}"}
+    headers = _auth_headers(api_key)
     
     max_retries = 3
     retry_delay = 30  # seconds
@@ -108,25 +243,28 @@ def get_session_status(api_key: str, session_id: str) -> Dict[str, Any]:
     for attempt in range(max_retries):
         try:
             # No timeout for status checks - be patient
-            with httpx.Client(timeout=None) as client:
-                response = client.get(url, headers=headers)
-                response.raise_for_status()
+            response = _client_or_shared(client).get(url, headers=headers)
+            response.raise_for_status()
             return response.json()
             
         except httpx.HTTPStatusError as e:
-            # Check if it's a server error (5xx) that we should retry
-            if e.response.status_code >= 500:
+            # The logger is only needed off the happy path, so polls don't look it up
+            logger = get_run_logger()
+            # Retry server errors (5xx) and rate limiting (429), waiting as long as the API asks
+            if e.response.status_code >= 500 or e.response.status_code == 429:
                 if attempt < max_retries - 1:
-                    logger.warning(f"   Got {e.response.status_code} error, retrying in {retry_delay}s (attempt {attempt+1}/{max_retries})")
-                    time.sleep(retry_delay)
+                    wait = _retry_after(e.response, retry_delay)
+                    logger.warning(f"   Got {e.response.status_code} error, retrying in {wait:.0f}s (attempt {attempt+1}/{max_retries})")
+                    time.sleep(wait)
                     continue
                 else:
                     logger.error(f"   Failed after {max_retries} attempts with {e.response.status_code} error")
                     raise
             else:
-                # For non-5xx errors, fail immediately
+                # For other client errors, fail immediately
                 raise
         except Exception as e:
+            logger = get_run_logger()
             # For network errors, also retry
             if attempt < max_retries - 1:
                 logger.warning(f"   Network error: {e}, retrying in {retry_delay}s (attempt {attempt+1}/{max_retries})")
@@ -137,50 +275,69 @@ def get_session_status(api_key: str, session_id: str) -> Dict[str, Any]:
                 raise
 
 
-def get_session_info(api_key: str, session_id: str) -> Dict[str, Any]:
+def get_session_info(
+    api_key: str, session_id: str, *, client: Optional[httpx.Client] = None
+) -> Dict[str, Any]:
     """Get session information."""
     url = f"https://api.devin.ai/v1/sessions/{session_id}"
-    headers = {"Authorization": f"Bearer {api_key}"}
+    headers = _auth_headers(api_key)
 
-    with httpx.Client(timeout=None) as client:
-        response = client.get(url, headers=headers)
-        response.raise_for_status()
+    response = _client_or_shared(client).get(url, headers=headers)
+    response.raise_for_status()
 
-    return response.json()
+    return json_loads(response.content)
 
 
-def send_sleep_message(api_key: str, session_id: str) -> None:
+def send_sleep_message(
+    api_key: str, session_id: str, *, client: Optional[httpx.Client] = None
+) -> None:
     """Send 'sleep' message to end the session and trigger analysis."""
     logger = get_run_logger()
 
     url = f"https://api.devin.ai/v1/sessions/{session_id}/message"
-    headers = {"Authorization": f"Bearer {api_key}"}
+    headers = {**_auth_headers(api_key), "Content-Type": "application/json"}
     data = {"message": "sleep"}
 
     # No timeout - wait as long as needed for command to complete
-    with httpx.Client(timeout=None) as client:
-        response = client.post(url, headers=headers, json=data)
-        response.raise_for_status()
+    response = _client_or_shared(client).post(
+        url, headers=headers, content=json_dumps(data)
+    )
+    response.raise_for_status()
 
     logger.info("💤 Sleep message sent - session ending and analysis triggered")
 
 
+def _jittered(delay: float) -> float:
+    """Spread a poll delay by +/- POLL_JITTER."""
+    return delay * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+
 def wait_for_status(
     api_key: str,
     session_id: str,
     target_statuses: list,
     poll_interval: int = DEFAULT_POLL_INTERVAL,
     check_structured_output: bool = False,
-) -> str:
+    *,
+    client: Optional[httpx.Client] = None,
+) -> Dict[str, Any]:
     """Wait for session to reach one of the target statuses.
 
-    Optionally also checks for structured output to see when it first appears.
+    Returns the session details from the poll that reached it (status is in
+    "status_enum"), so callers can read e.g. structured output without another
+    request. Optionally also checks for structured output to see when it first
+    appears.
+    Polls back off from MIN_POLL_INTERVAL up to MAX_POLL_INTERVAL (or
+    poll_interval, if larger) while the status is unchanged and start fast
+    again after every transition.
     """
 
-    start_time = time.time()
+    start_time = time.monotonic()
     logger = get_run_logger()
     first_structured_output_time = None
     previous_status = None
+    delay = min(MIN_POLL_INTERVAL, poll_interval)
+    max_delay = max(poll_interval, MAX_POLL_INTERVAL)
 
     # Status transition messages for better observability
     status_messages = {
@@ -192,10 +349,10 @@ def wait_for_status(
     }
 
     while True:
-        details = get_session_status(api_key, session_id)
+        details = get_session_status(api_key, session_id, client=client)
         status = details.get("status_enum")
 
-        elapsed = int(time.time() - start_time)
+        elapsed = int(time.monotonic() - start_time)
 
         # Log status transitions with meaningful messages
         if status != previous_status:
@@ -219,9 +376,10 @@ def wait_for_status(
                         f"   Status changed: {status_messages.get(previous_status, previous_status)} → {status_messages.get(status, status)} (at {elapsed}s)"
                     )
             previous_status = status
+            delay = min(MIN_POLL_INTERVAL, poll_interval)
         else:
             # Still same status, use debug
-            logger.debug(f"   Status: {status} (elapsed: {elapsed}s)")
+            logger.debug("   Status: %s (elapsed: %ds)", status, elapsed)
 
         # Check for structured output if requested
         if check_structured_output and not first_structured_output_time:
@@ -232,43 +390,32 @@ def wait_for_status(
                     f"🎯 STRUCTURED OUTPUT FIRST APPEARED at {elapsed}s after session start!"
                 )
                 logger.info(f"   Session status: {status}")
-                logger.debug(
-                    f"   Output preview: {json.dumps(structured_output, indent=2)[:300]}..."
-                )
+                # Only pretty-print the output when debug logging will show it
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        f"   Output preview: {json.dumps(structured_output, indent=2)[:300]}..."
+                    )
 
         if status in target_statuses:
-            return status
-
-        time.sleep(poll_interval)
-
+            return details
 
-def get_session_structured_output(api_key: str, session_id: str) -> Optional[Dict[str, Any]]:
-    """Get session structured output."""
-    url = f"https://api.devin.ai/v1/sessions/{session_id}"
-    headers = {"Authorization": f"Bearer {api_key}"}
-
-    # No timeout for structured output fetches - wait as long as needed
-    with httpx.Client(timeout=None) as client:
-        response = client.get(url, headers=headers)
-        response.raise_for_status()
+        time.sleep(_jittered(delay))
+        delay = min(delay * POLL_BACKOFF, max_delay)
 
-    session_data = response.json()
-    return session_data.get("structured_output")
 
+def get_enterprise_session_data(
+    api_key: str, session_id: str, *, client: Optional[httpx.Client] = None
+) -> Dict[str, Any]:
+    """Get full enterprise session data including PRs and analysis with retry logic.
 
-def get_enterprise_session_data(api_key: str, session_id: str) -> Dict[str, Any]:
-    """Get full enterprise session data including PRs and analysis with retry logic."""
-    from prefect.logging import get_run_logger
-    import time
-    
-    logger = get_run_logger()
-    
+    Pass a shared client to reuse its connection; otherwise the pooled module client is used.
+    """
     # Ensure session_id has the 'devin-' prefix for enterprise API
     if not session_id.startswith('devin-'):
         session_id = f'devin-{session_id}'
 
     url = f"https://api.devin.ai/beta/v2/enterprise/sessions/{session_id}"
-    headers = {"Authorization": f"Bearer {api_key}"}
+    headers = _auth_headers(api_key)
     
     max_retries = 3
     retry_delay = 30  # seconds
@@ -276,25 +423,28 @@ def get_enterprise_session_data(api_key: str, session_id: str) -> Dict[str, Any]
     for attempt in range(max_retries):
         try:
             # No timeout for enterprise data fetches - API can be slow, be patient
-            with httpx.Client(timeout=None) as client:
-                response = client.get(url, headers=headers)
-                response.raise_for_status()
-            return response.json()
+            response = _client_or_shared(client).get(url, headers=headers)
+            response.raise_for_status()
+            return json_loads(response.content)
             
         except httpx.HTTPStatusError as e:
-            # Check if it's a server error (5xx) that we should retry
-            if e.response.status_code >= 500:
+            # The logger is only needed off the happy path, so polls don't look it up
+            logger = get_run_logger()
+            # Retry server errors (5xx) and rate limiting (429), waiting as long as the API asks
+            if e.response.status_code >= 500 or e.response.status_code == 429:
                 if attempt < max_retries - 1:
-                    logger.warning(f"   Got {e.response.status_code} error on enterprise API, retrying in {retry_delay}s (attempt {attempt+1}/{max_retries})")
-                    time.sleep(retry_delay)
+                    wait = _retry_after(e.response, retry_delay)
+                    logger.warning(f"   Got {e.response.status_code} error on enterprise API, retrying in {wait:.0f}s (attempt {attempt+1}/{max_retries})")
+                    time.sleep(wait)
                     continue
                 else:
                     logger.error(f"   Enterprise API failed after {max_retries} attempts with {e.response.status_code} error")
                     raise
             else:
-                # For non-5xx errors, fail immediately
+                # For other client errors, fail immediately
                 raise
         except Exception as e:
+            logger = get_run_logger()
             # For network errors, also retry
             if attempt < max_retries - 1:
                 logger.warning(f"   Enterprise API network error: {e}, retrying in {retry_delay}s (attempt {attempt+1}/{max_retries})")
@@ -305,30 +455,98 @@ def get_enterprise_session_data(api_key: str, session_id: str) -> Dict[str, Any]
                 raise
 
 
-def get_session_analysis(api_key: str, session_id: str) -> Optional[Dict[str, Any]]:
+def get_enterprise_session_data_bulk(
+    api_key: str, session_ids: List[str]
+) -> Dict[str, Dict[str, Any]]:
+    """Get enterprise session data for several sessions at once.
+
+    The enterprise API has no batch endpoint, so the sessions are fetched
+    concurrently over one shared HTTP/2 client. Sessions that still fail after
+    retries are logged and left out of the result.
+
+    Returns:
+        Mapping of session_id (as passed in) to its session data
+    """
+    logger = get_run_logger()
+    results = {}
+    if not session_ids:
+        return results
+
+    # Each lookup runs in a copy of the caller's context so logging stays
+    # attached to the current run. The lookups share the pooled client, so
+    # repeated bulk polls reuse its connections.
+    with ThreadPoolExecutor(
+        max_workers=min(len(session_ids), BULK_FETCH_WORKERS)
+    ) as executor:
+        lookups = {
+            session_id: executor.submit(
+                copy_context().run,
+                get_enterprise_session_data,
+                api_key,
+                session_id,
+            )
+            for session_id in session_ids
+        }
+
+    for session_id, lookup in lookups.items():
+        try:
+            results[session_id] = lookup.result()
+        except Exception as e:
+            logger.warning(f"   ⚠️ Failed to fetch session {session_id}: {e}")
+
+    return results
+
+
+def get_session_analysis(
+    api_key: str, session_id: str, *, client: Optional[httpx.Client] = None
+) -> Optional[Dict[str, Any]]:
     """Get session analysis from enterprise endpoint."""
-    data = get_enterprise_session_data(api_key, session_id)
+    data = get_enterprise_session_data(api_key, session_id, client=client)
     return data.get("session_analysis")
 
 
 def wait_for_analysis(
-    api_key: str, session_id: str, poll_interval: int = DEFAULT_POLL_INTERVAL
+    api_key: str,
+    session_id: str,
+    poll_interval: int = DEFAULT_POLL_INTERVAL,
+    *,
+    client: Optional[httpx.Client] = None,
+) -> Dict[str, Any]:
+    """Wait for session analysis to become available.
+
+    Polls back off from MIN_POLL_INTERVAL up to MAX_POLL_INTERVAL (or
+    poll_interval, if larger) until the analysis appears.
+    """
+    data = _wait_for_analysis_data(api_key, session_id, poll_interval, client=client)
+    return data["session_analysis"]
+
+
+def _wait_for_analysis_data(
+    api_key: str,
+    session_id: str,
+    poll_interval: int = DEFAULT_POLL_INTERVAL,
+    *,
+    client: Optional[httpx.Client] = None,
 ) -> Dict[str, Any]:
-    """Wait for session analysis to become available."""
+    """Like wait_for_analysis, but return the whole enterprise session data
+    from the poll that found the analysis (PRs included)."""
 
-    start_time = time.time()
+    start_time = time.monotonic()
     logger = get_run_logger()
+    delay = min(MIN_POLL_INTERVAL, poll_interval)
+    max_delay = max(poll_interval, MAX_POLL_INTERVAL)
 
     while True:
-        analysis = get_session_analysis(api_key, session_id)
-        elapsed = int(time.time() - start_time)
+        data = get_enterprise_session_data(api_key, session_id, client=client)
+        elapsed = int(time.monotonic() - start_time)
 
-        if analysis:
+        if data.get("session_analysis"):
             logger.info(f"✅ Analysis available (elapsed: {elapsed}s)")
-            return analysis
+            return data
 
-        logger.debug(f"   Analysis not ready (elapsed: {elapsed}s)")
-        time.sleep(poll_interval)
+        logger.debug("   Analysis not ready (elapsed: %ds)", elapsed)
+        time.sleep(_jittered(delay))
+        delay = min(delay * POLL_BACKOFF, max_delay)
 
 
 
@@ -357,7 +575,7 @@ def run_session_until_blocked(
         Dict containing session_id, status, and timing information
     """
     logger = get_run_logger()
-    start_time = time.time()
+    start_time = time.monotonic()
 
     # Setup
     if api_key is None:
@@ -368,30 +586,36 @@ def run_session_until_blocked(
     logger.info("🚀 Starting Session Work Phase")
     logger.info(f"📋 Prompt: {prompt[:100]}...")
 
-    # Step 1: Create session
-    logger.info("[Step 1/2] Creating session...")
-    session_id = create_session(api_key, prompt, title, structured_output_schema)
+    # One connection for all of this session's API calls
+    with _new_client() as client:
+        # Step 1: Create session
+        logger.info("[Step 1/2] Creating session...")
+        session_id = create_session(
+            api_key, prompt, title, structured_output_schema, client=client
+        )
 
-    # Step 2: Wait for blocked state (and check for structured output if schema provided)
-    logger.info("[Step 2/2] Waiting for blocked or finished state...")
+        # Step 2: Wait for blocked state (and check for structured output if schema provided)
+        logger.info("[Step 2/2] Waiting for blocked or finished state...")
 
-    # Enable structured output checking if schema was provided
-    if structured_output_schema:
-        logger.info("   📊 Also checking for when structured output appears...")
+        # Enable structured output checking if schema was provided
+        if structured_output_schema:
+            logger.info("   📊 Also checking for when structured output appears...")
 
-    status = wait_for_status(
-        api_key,
-        session_id,
-        ["blocked", "finished", "expired"],  # Note: finished = sleeping
-        poll_interval=poll_interval,
-        check_structured_output=(structured_output_schema is not None),
-    )
+        details = wait_for_status(
+            api_key,
+            session_id,
+            ["blocked", "finished", "expired"],  # Note: finished = sleeping
+            poll_interval=poll_interval,
+            check_structured_output=(structured_output_schema is not None),
+            client=client,
+        )
+        status = details.get("status_enum")
 
     logger.info(f"✅ Session reached {status} state")
 
     # Return session info and status
     session_url = f"https://app.devin.ai/sessions/{session_id.replace('devin-', '')}"
-    execution_time = time.time() - start_time
+    execution_time = time.monotonic() - start_time
 
     return {
         "session_id": session_id,
@@ -403,6 +627,7 @@ def run_session_until_blocked(
         "has_schema": structured_output_schema
         is not None,  # Pass through for next task
         "title": title,  # Pass through for artifacts
+        "last_details": details,  # Latest session details, reused by the next task
     }
 
 
@@ -422,7 +647,7 @@ def generate_analysis(
         Dict containing analysis and structured output
     """
     logger = get_run_logger()
-    start_time = time.time()
+    start_time = time.monotonic()
 
     # Extract info from previous task
     session_id = session_info["session_id"]
@@ -432,93 +657,116 @@ def generate_analysis(
     poll_interval = session_info["poll_interval"]
     has_schema = session_info["has_schema"]
     title = session_info.get("title")
+    details = session_info.get("last_details")
 
     logger.info("📊 Starting Analysis Generation Phase")
     logger.info(f"   Session: {session_id}")
     logger.info(f"   Current status: {status}")
 
-    # Handle different statuses
-    if status != "blocked":
-        logger.warning(f"⚠️  Session ended with status: {status}")
-        if status == "finished":  # finished = sleeping
-            # Already sleeping, skip to analysis
-            logger.info("   Session already sleeping, checking for analysis...")
+    # One connection for all of this session's API calls
+    with _new_client() as client:
+        # Handle different statuses
+        if status != "blocked":
+            logger.warning(f"⚠️  Session ended with status: {status}")
+            if status == "finished":  # finished = sleeping
+                # Already sleeping, skip to analysis
+                logger.info("   Session already sleeping, checking for analysis...")
+            else:
+                raise ValueError(f"Unexpected session status: {status}")
         else:
-            raise ValueError(f"Unexpected session status: {status}")
-    else:
-        # Step 1: Send sleep message to end session
-        logger.info("[Step 1/3] Sending sleep message to trigger analysis...")
-        send_sleep_message(api_key, session_id)
-
-        # Step 2: Wait for sleeping state
-        logger.info("[Step 2/3] Waiting for sleeping state...")
-        status = wait_for_status(
-            api_key,
-            session_id,
-            ["finished", "expired"],
-            poll_interval=poll_interval,
+            # Step 1: Send sleep message to end session
+            logger.info("[Step 1/3] Sending sleep message to trigger analysis...")
+            send_sleep_message(api_key, session_id, client=client)
+
+            # Step 2: Wait for sleeping state
+            logger.info("[Step 2/3] Waiting for sleeping state...")
+            details = wait_for_status(
+                api_key,
+                session_id,
+                ["finished", "expired"],
+                poll_interval=poll_interval,
+                client=client,
+            )
+            status = details.get("status_enum")
+
+            if status != "finished":  # finished = sleeping
+                raise ValueError(f"Session ended with status: {status}")
+
+        # Step 3: Wait for session analysis and get full enterprise data
+        logger.info("[Step 3/3] Waiting for session analysis...")
+        # The poll that finds the analysis also carries the session's PRs
+        enterprise_data = _wait_for_analysis_data(
+            api_key, session_id, poll_interval=poll_interval, client=client
         )
-
-        if status != "finished":  # finished = sleeping
-            raise ValueError(f"Session ended with status: {status}")
-
-    # Step 3: Wait for session analysis and get full enterprise data
-    logger.info("[Step 3/3] Waiting for session analysis...")
-    analysis = wait_for_analysis(api_key, session_id, poll_interval=poll_interval)
-    
-    # Get full enterprise data to extract PRs
-    enterprise_data = get_enterprise_session_data(api_key, session_id)
-    prs = enterprise_data.get("prs", [])
+        analysis = enterprise_data["session_analysis"]
+        prs = enterprise_data.get("prs", [])
     
-    if prs:
-        logger.info(f"   🔧 Found {len(prs)} PR(s) created in session")
-        for pr in prs:
-            pr_url = pr.get("pr_url")
-            if pr_url:
-                logger.info(f"      📍 {pr_url} (state: {pr.get('state', 'unknown')})")
-
-    # Get final structured output if schema was provided
-    structured_output = None
-    if has_schema:
-        logger.info("   Getting final structured output...")
-        structured_output = get_structured_output(api_key, session_id)
-        if structured_output:
-            logger.info("   ✅ Final structured output retrieved")
-        else:
-            logger.warning("   ⚠️  No structured output available at session end")
+        if prs:
+            logger.info(f"   🔧 Found {len(prs)} PR(s) created in session")
+            for pr in prs:
+                pr_url = pr.get("pr_url")
+                if pr_url:
+                    logger.info(f"      📍 {pr_url} (state: {pr.get('state', 'unknown')})")
+
+        # Get final structured output if schema was provided
+        structured_output = None
+        if has_schema:
+            logger.info("   Getting final structured output...")
+            # The last status poll already returned the session, structured output included
+            if details is None:
+                details = get_session_status(api_key, session_id, client=client)
+            structured_output = details.get("structured_output")
+            if structured_output:
+                logger.info("   ✅ Final structured output retrieved")
+            else:
+                logger.warning("   ⚠️  No structured output available at session end")
 
     logger.info("✅ Analysis generation complete!")
 
     # Create artifacts with all the session analysis details
     if analysis:
         logger.info("📄 Creating artifacts...")
+        execution_time = time.monotonic() - start_time
+
+        # Each artifact is a separate API write, so create them side by side.
+        # Each runs in a copy of this run's context so it stays attached to it.
+        with ThreadPoolExecutor(max_workers=5) as executor:
+
+            def submit(fn, *args, **kwargs):
+                return executor.submit(copy_context().run, fn, *args, **kwargs)
+
+            pending = [
+                # Timeline artifact (issues and timeline)
+                submit(create_timeline_artifact, session_id, session_url, analysis),
+                # Improvements artifact (prompt suggestions and action items)
+                submit(create_improvements_artifact, session_id, analysis),
+                # Session quick stats artifact
+                submit(
+                    create_session_quick_stats_artifact,
+                    session_id=session_id,
+                    session_url=session_url,
+                    analysis=analysis,
+                    execution_time=execution_time,
+                    title=title,
+                ),
+            ]
+            # Structured output artifact if available
+            if structured_output:
+                pending.append(
+                    submit(create_structured_output_artifact, session_id, structured_output)
+                )
+            # PR artifact if PRs were created
+            if prs:
+                pending.append(submit(create_pr_artifact, session_id, prs))
 
-        # Create timeline artifact (issues and timeline)
-        create_timeline_artifact(session_id, session_url, analysis)
-
-        # Create improvements artifact (prompt suggestions and action items)
-        create_improvements_artifact(session_id, analysis)
-
-        # Create session quick stats artifact
-        execution_time = time.time() - start_time
-        create_session_quick_stats_artifact(
-            session_id=session_id,
-            session_url=session_url,
-            analysis=analysis,
-            execution_time=execution_time,
-            title=title,
-        )
+        # Surface the first failure, as the sequential calls did
+        for future in pending:
+            future.result()
 
-        # Create structured output artifact if available
         if structured_output:
-            create_structured_output_artifact(session_id, structured_output)
             logger.info("✅ Structured output artifact created")
-        
-        # Create PR artifact if PRs were created
         if prs:
-            create_pr_artifact(session_id, prs)
             logger.info(f"✅ PR artifact created for {len(prs)} PR(s)")
-
         logger.info("✅ Artifacts created successfully")
 
     # Extract the improved prompt from nested structure
@@ -635,58 +883,63 @@ def run_session_and_wait_for_pr(
     api_key = session_info["api_key"]
     session_id = session_info["session_id"]
     
-    # Phase 2: Send sleep message to end session
-    logger.info("── Phase 2: Ending Session ──")
-    logger.info("   Sending sleep message...")
-    send_sleep_message(api_key, session_id)
+    # One connection for all of this session's API calls
+    with _new_client() as client:
+        # Phase 2: Send sleep message to end session
+        logger.info("── Phase 2: Ending Session ──")
+        logger.info("   Sending sleep message...")
+        send_sleep_message(api_key, session_id, client=client)
     
-    # Wait for session to finish (sleeping state)
-    logger.info("   Waiting for session to enter sleeping state...")
-    status = wait_for_status(
-        api_key,
-        session_id,
-        ["finished", "expired"],
-        poll_interval=poll_interval,
-    )
+        # Wait for session to finish (sleeping state)
+        logger.info("   Waiting for session to enter sleeping state...")
+        details = wait_for_status(
+            api_key,
+            session_id,
+            ["finished", "expired"],
+            poll_interval=poll_interval,
+            client=client,
+        )
+        status = details.get("status_enum")
     
-    if status != "finished":  # finished = sleeping
-        raise ValueError(f"Session ended with unexpected status: {status}")
+        if status != "finished":  # finished = sleeping
+            raise ValueError(f"Session ended with unexpected status: {status}")
     
-    logger.info("   ✅ Session is sleeping")
+        logger.info("   ✅ Session is sleeping")
     
-    # Phase 3: Wait for PR to be created
-    logger.info("── Phase 3: Waiting for Pull Request ──")
+        # Phase 3: Wait for PR to be created
+        logger.info("── Phase 3: Waiting for Pull Request ──")
     
-    elapsed = 0
-    prs = []
+        elapsed = 0
+        prs = []
     
-    while elapsed < max_wait_for_pr:
-        # Get enterprise data to check for PRs
-        enterprise_data = get_enterprise_session_data(api_key, session_id)
-        prs = enterprise_data.get("prs", [])
+        while elapsed < max_wait_for_pr:
+            # Get enterprise data to check for PRs
+            enterprise_data = get_enterprise_session_data(api_key, session_id, client=client)
+            prs = enterprise_data.get("prs", [])
         
-        if prs:
-            logger.info(f"   🔧 Found {len(prs)} PR(s)!")
-            for pr in prs:
-                pr_url = pr.get("pr_url")
-                if pr_url:
-                    logger.info(f"      📍 {pr_url} (state: {pr.get('state', 'unknown')})")
-            break
+            if prs:
+                logger.info(f"   🔧 Found {len(prs)} PR(s)!")
+                for pr in prs:
+                    pr_url = pr.get("pr_url")
+                    if pr_url:
+                        logger.info(f"      📍 {pr_url} (state: {pr.get('state', 'unknown')})")
+                break
         
-        logger.debug(f"   No PRs yet, waiting... ({elapsed}s / {max_wait_for_pr}s)")
-        time.sleep(poll_interval)
-        elapsed += poll_interval
+            logger.debug("   No PRs yet, waiting... (%ss / %ss)", elapsed, max_wait_for_pr)
+            time.sleep(poll_interval)
+            elapsed += poll_interval
     
-    if not prs:
-        logger.warning(f"   ⚠️  No PRs found after waiting {max_wait_for_pr} seconds")
+        if not prs:
+            logger.warning(f"   ⚠️  No PRs found after waiting {max_wait_for_pr} seconds")
     
-    # Get final structured output if schema was provided
-    structured_output = None
-    if structured_output_schema:
-        logger.info("   Getting final structured output...")
-        structured_output = get_session_structured_output(api_key, session_id)
-        if structured_output:
-            logger.info("   ✅ Final structured output retrieved")
+        # Get final structured output if schema was provided
+        structured_output = None
+        if structured_output_schema:
+            logger.info("   Getting final structured output...")
+            # Reuse the session details from the sleeping-state poll
+            structured_output = details.get("structured_output")
+            if structured_output:
+                logger.info("   ✅ Final structured output retrieved")
     
     logger.info("✅ Full orchestration complete!")
     
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Critical Path Priority Utility
+
+Computes each task's critical-path weight: its own estimated hours plus the
+longest chain of work that depends on it. Tasks with the highest weight are
+the ones holding up the rest of the plan, so they should be scheduled first.
+"""
+
+from typing import Dict, List, Any
+from collections import defaultdict, deque
+
+
+def compute_cp(tasks: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Compute critical-path weights for all tasks in O(tasks + dependencies).
+
+    Walks the graph in reverse topological order so every successor is scored
+    before the tasks it depends on: cp[v] = hours(v) + max(cp[u] for u in successors(v)).
+
+    Args:
+        tasks: List of task dictionaries with 'id', 'depends_on', and optionally 'estimated_hours'
+
+    Returns:
+        Dictionary mapping task_id to critical-path weight in hours
+    """
+    task_dict = {task["id"]: task for task in tasks}
+    successors = defaultdict(list)
+    pending_successors = {task_id: 0 for task_id in task_dict}
+
+    for task in tasks:
+        for dep in task.get("depends_on", []):
+            # Dependencies outside the plan don't contribute any work
+            if dep in task_dict:
+                successors[dep].append(task["id"])
+                pending_successors[dep] += 1
+
+    # Start from the sinks (tasks nothing depends on) and work backwards
+    queue = deque(task_id for task_id, count in pending_successors.items() if count == 0)
+    cp = {}
+
+    while queue:
+        task_id = queue.popleft()
+        task = task_dict[task_id]
+        cp[task_id] = task.get("estimated_hours", 8) + max(
+            (cp[succ] for succ in successors[task_id]), default=0
+        )
+        for dep in task.get("depends_on", []):
+            if dep in task_dict:
+                pending_successors[dep] -= 1
+                if pending_successors[dep] == 0:
+                    queue.append(dep)
+
+    if len(cp) < len(task_dict):
+        stuck = next(task_id for task_id in task_dict if task_id not in cp)
+        raise ValueError(f"Circular dependency detected involving task: {stuck}")
+
+    return cp
@@ -113,7 +113,7 @@ def wait_for_prs_to_merge_github(
         logger.warning("⚠️ No GITHUB_TOKEN found - API rate limits may apply")
         logger.info("   Set GITHUB_TOKEN environment variable for better rate limits")
     
-    start_time = time.time()
+    start_time = time.monotonic()
     max_wait_seconds = max_wait_minutes * 60
     
     while True:
@@ -143,7 +143,7 @@ def wait_for_prs_to_merge_github(
             return True
         
         # Check timeout
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         if elapsed >= max_wait_seconds:
             logger.warning(f"⏱️ Timeout after {max_wait_minutes} minutes")
             unmerged = [pr['url'] for pr in pr_tracking if not pr['merged']]
@@ -1,5 +1,6 @@
 """Artifacts for prompt iteration flows."""
 
+import difflib
 from typing import List
 from prefect.artifacts import create_markdown_artifact
 
@@ -19,10 +20,18 @@ def create_progress_artifact(
     for i, prompt in enumerate(prompt_history):
         if i == 0:
             md += f"### 🎯 Initial Prompt\n"
+            md += f"```\n{prompt}\n```\n\n"
         else:
+            # Show only what changed from the previous prompt
             md += f"### 💡 Iteration {i} - Improved Prompt\n"
-
-        md += f"```\n{prompt}\n```\n\n"
+            diff = difflib.unified_diff(
+                prompt_history[i - 1].splitlines(),
+                prompt.splitlines(),
+                lineterm="",
+                n=1,
+            )
+            hunks = list(diff)[2:]  # Drop the ---/+++ file header lines
+            md += "```diff\n" + "\n".join(hunks) + "\n```\n\n"
 
         if i < len(session_ids):
             session_id = session_ids[i]
@@ -5,10 +5,14 @@ Tests for run_sessions.py module.
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import json
+import httpx
 from tasks.run_sessions import (
     run_session_and_wait_for_analysis,
     run_session_until_blocked,
     generate_analysis,
+    get_session_status,
+    _retry_after,
+    MAX_POLL_INTERVAL,
 )
 
 
@@ -329,3 +333,107 @@ def test_run_session_api_error(mock_httpx_client, mock_api_key):
         )
 
     assert "401 Unauthorized" in str(exc_info.value)
+
+
+@patch("tasks.run_sessions.httpx.Client")
+@patch("tasks.run_sessions.get_run_logger")
+@patch("tasks.run_sessions.create_timeline_artifact")
+@patch("tasks.run_sessions.create_improvements_artifact")
+@patch("tasks.run_sessions.create_session_quick_stats_artifact")
+@patch("tasks.run_sessions.create_structured_output_artifact")
+def test_generate_analysis_reuses_last_details(
+    mock_structured_output_artifact,
+    mock_quick_stats_artifact,
+    mock_improvements_artifact,
+    mock_timeline_artifact,
+    mock_get_run_logger,
+    mock_httpx_client,
+    mock_analysis_response,
+):
+    """Test generate_analysis takes structured output from the last status poll."""
+
+    # Setup mock client
+    mock_client = MagicMock()
+    mock_httpx_client.return_value.__enter__.return_value = mock_client
+
+    # Only the analysis poll should hit the API
+    analysis_response = Mock()
+    analysis_response.content = json.dumps(mock_analysis_response).encode()
+    analysis_response.raise_for_status = Mock()
+    mock_client.get.return_value = analysis_response
+
+    # Input from previous task, already sleeping, with its last status poll
+    session_info = {
+        "session_id": "devin-test-session-123",
+        "session_url": "https://app.devin.ai/sessions/test-session-123",
+        "status": "finished",
+        "api_key": "test-api-key-123",
+        "poll_interval": 10,
+        "has_schema": True,
+        "title": "Test Session",
+        "execution_time": 60.0,
+        "last_details": {
+            "status_enum": "finished",
+            "structured_output": {"progress": "done"},
+        },
+    }
+
+    # Run the task body directly
+    result = generate_analysis.fn(session_info)
+
+    # Assertions
+    assert result["structured_output"] == {"progress": "done"}
+    assert result["analysis"] == mock_analysis_response["session_analysis"]
+
+    # Verify API calls - no extra status GET for the structured output
+    assert mock_client.post.call_count == 0
+    assert mock_client.get.call_count == 1
+
+    # Verify structured output artifact was created
+    mock_structured_output_artifact.assert_called_once()
+
+
+def test_retry_after():
+    """Test Retry-After parsing falls back to the default when unusable."""
+    request = httpx.Request("GET", "https://api.devin.ai/v1/sessions/test")
+
+    seconds = httpx.Response(429, headers={"retry-after": "7"}, request=request)
+    missing = httpx.Response(429, request=request)
+    http_date = httpx.Response(
+        429, headers={"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, request=request
+    )
+
+    negative = httpx.Response(429, headers={"retry-after": "-1"}, request=request)
+    not_a_number = httpx.Response(429, headers={"retry-after": "nan"}, request=request)
+    infinite = httpx.Response(429, headers={"retry-after": "inf"}, request=request)
+    very_large = httpx.Response(429, headers={"retry-after": "1e9"}, request=request)
+
+    assert _retry_after(seconds, 30) == 7.0
+    assert _retry_after(missing, 30) == 30
+    assert _retry_after(http_date, 30) == 30
+
+    # Values time.sleep would reject or that would stall the task
+    assert _retry_after(negative, 30) == 0.0
+    assert _retry_after(not_a_number, 30) == 30
+    assert _retry_after(infinite, 30) == 30
+    assert _retry_after(very_large, 30) == MAX_POLL_INTERVAL
+
+
+@patch("tasks.run_sessions.time.sleep")
+@patch("tasks.run_sessions.get_run_logger")
+def test_get_session_status_retries_rate_limit(
+    mock_get_run_logger, mock_sleep, mock_api_key, mock_session_status_working
+):
+    """Test get_session_status waits as long as a 429 asks, then retries."""
+    request = httpx.Request("GET", "https://api.devin.ai/v1/sessions/test")
+    mock_client = MagicMock()
+    mock_client.get.side_effect = [
+        httpx.Response(429, headers={"retry-after": "5"}, request=request),
+        httpx.Response(200, json=mock_session_status_working, request=request),
+    ]
+
+    result = get_session_status(mock_api_key, "devin-test-session-123", client=mock_client)
+
+    assert result == mock_session_status_working
+    assert mock_client.get.call_count == 2
+    mock_sleep.assert_called_once_with(5.0)
@@ -0,0 +1,140 @@
+"""
+Tests for iterate_on_prompt.py module.
+"""
+
+import copy
+import logging
+import pytest
+from unittest.mock import Mock, patch
+import iterate_on_prompt
+from iterate_on_prompt import iterate_on_prompt as iterate_flow, iterate_on_prompts_batch
+
+
+class FakeJSONBlock:
+    """In-memory stand-in for the Prefect JSON block used to save progress."""
+
+    saved = {}
+
+    def __init__(self, value):
+        self.value = value
+
+    @classmethod
+    def load(cls, name):
+        if name not in cls.saved:
+            raise ValueError(f"Unable to find block document named {name}")
+        return cls(cls.saved[name])
+
+    def save(self, name, overwrite=False):
+        # Saving serializes the value, so later changes to it aren't stored
+        self.saved[name] = copy.deepcopy(self.value)
+
+
+def session_result(session_id, suggested_prompt=None):
+    """Task result in the shape run_session_and_wait_for_analysis returns."""
+    return {
+        "session_id": session_id,
+        "suggested_prompt": suggested_prompt,
+        "analysis": {"issues": []},
+    }
+
+
+@pytest.fixture(autouse=True)
+def isolated_module():
+    """Run the flow bodies without a Prefect server or API calls."""
+    iterate_on_prompt._PROMPT_CACHE.clear()
+    FakeJSONBlock.saved = {}
+    with patch(
+        "iterate_on_prompt.get_run_logger",
+        return_value=logging.getLogger("test_iterate_on_prompt"),
+    ), patch("iterate_on_prompt.JSON", FakeJSONBlock), patch(
+        "iterate_on_prompt.create_progress_artifact"
+    ):
+        yield
+
+
+@patch("iterate_on_prompt.run_session_and_wait_for_analysis")
+def test_resume_continues_from_saved_state(mock_run_session):
+    """A second run with the same resume_key picks up at the saved prompt."""
+    mock_run_session.side_effect = [
+        session_result("session-1", "Prompt B"),
+        session_result("session-2", "Prompt C"),
+    ]
+
+    session_ids = iterate_flow.fn(
+        initial_prompt="Prompt A", iterations=2, resume_key="resume-test"
+    )
+
+    assert session_ids == ["session-1", "session-2"]
+    assert FakeJSONBlock.saved["resume-test"] == {
+        "prompt_history": ["Prompt A", "Prompt B", "Prompt C"],
+        "session_ids": ["session-1", "session-2"],
+    }
+
+    mock_run_session.reset_mock()
+    mock_run_session.side_effect = [session_result("session-3")]
+
+    session_ids = iterate_flow.fn(
+        initial_prompt="Prompt A", iterations=3, resume_key="resume-test"
+    )
+
+    # Only the third iteration runs, with the last saved prompt
+    assert session_ids == ["session-1", "session-2", "session-3"]
+    mock_run_session.assert_called_once_with(
+        prompt="Prompt C", title="Prompt Iteration - Iteration 3"
+    )
+
+
+@patch("iterate_on_prompt.run_session_and_wait_for_analysis")
+def test_resume_after_convergence_runs_nothing(mock_run_session):
+    """A saved run that stopped without a new prompt is not run again."""
+    FakeJSONBlock.saved["resume-test"] = {
+        "prompt_history": ["Prompt A"],
+        "session_ids": ["session-1"],
+    }
+
+    session_ids = iterate_flow.fn(
+        initial_prompt="Prompt A", iterations=3, resume_key="resume-test"
+    )
+
+    assert session_ids == ["session-1"]
+    mock_run_session.assert_not_called()
+
+
+@patch("iterate_on_prompt.run_session_and_wait_for_analysis")
+def test_suggestion_cycling_back_stops_iteration(mock_run_session):
+    """A suggestion that normalizes to an earlier prompt ends the loop."""
+    mock_run_session.side_effect = [
+        session_result("session-1", "Prompt B"),
+        session_result("session-2", "  prompt   a "),
+        session_result("session-3", "Prompt D"),
+    ]
+
+    session_ids = iterate_flow.fn(initial_prompt="Prompt A", iterations=5)
+
+    assert session_ids == ["session-1", "session-2"]
+    assert mock_run_session.call_count == 2
+
+
+@patch("iterate_on_prompt.run_session_and_wait_for_analysis")
+def test_batch_coalesces_equivalent_prompts(mock_run_session):
+    """Seeds whose prompts only differ cosmetically share one session."""
+
+    def fake_map(prompt, title):
+        futures = []
+        for k, _ in enumerate(prompt):
+            future = Mock()
+            future.result.return_value = session_result(f"session-{k + 1}")
+            futures.append(future)
+        return futures
+
+    mock_run_session.map.side_effect = fake_map
+
+    session_ids = iterate_on_prompts_batch.fn(
+        initial_prompts=["Fix the bug", "fix  the BUG", "Write docs"], iterations=3
+    )
+
+    mock_run_session.map.assert_called_once_with(
+        prompt=["Fix the bug", "Write docs"],
+        title=["Prompt Iteration 1 - Iteration 1", "Prompt Iteration 3 - Iteration 1"],
+    )
+    assert session_ids == [["session-1"], ["session-1"], ["session-2"]]
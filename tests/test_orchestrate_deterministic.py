@@ -0,0 +1,97 @@
+"""
+Tests for the PlanIndex ready-task index in orchestrate_deterministic.py.
+"""
+
+import copy
+
+import pytest
+from orchestrate_deterministic import PlanIndex, find_ready_tasks
+
+
+@pytest.fixture
+def plan():
+    """Small plan: a -> b -> d, a -> c -> d, plus a task waiting on an unknown dep."""
+    return {
+        "tasks": [
+            {"id": "a", "status": "not-complete", "depends_on": []},
+            {"id": "b", "status": "not-complete", "depends_on": ["a"]},
+            {"id": "c", "status": "not-complete", "depends_on": ["a"]},
+            {"id": "d", "status": "not-complete", "depends_on": ["b", "c"]},
+            {"id": "e", "status": "not-complete", "depends_on": ["missing"]},
+        ]
+    }
+
+
+def ready_ids(tasks):
+    return [t["id"] for t in tasks]
+
+
+def complete(plan, *task_ids):
+    """Return a copy of the plan with the given tasks marked complete."""
+    updated = copy.deepcopy(plan)
+    for task in updated["tasks"]:
+        if task["id"] in task_ids:
+            task["status"] = "complete"
+    return updated
+
+
+def test_initial_ready_tasks(plan):
+    """Only tasks without open dependencies are ready; unknown deps never are."""
+    index = PlanIndex(plan["tasks"])
+
+    assert ready_ids(index.ready_tasks()) == ["a"]
+    assert ready_ids(find_ready_tasks(plan, index)) == ready_ids(find_ready_tasks(plan))
+
+
+def test_mark_complete_releases_dependents(plan):
+    """Completing a task releases dependents once their last dependency closes."""
+    index = PlanIndex(plan["tasks"])
+
+    index.mark_complete("a")
+    assert ready_ids(index.ready_tasks()) == ["b", "c"]
+
+    index.mark_complete("b")
+    assert ready_ids(index.ready_tasks()) == ["c"]
+
+    # Completing a task twice must not decrement its dependents again
+    index.mark_complete("b")
+    assert ready_ids(index.ready_tasks()) == ["c"]
+
+    index.mark_complete("c")
+    assert ready_ids(index.ready_tasks()) == ["d"]
+
+
+def test_reconcile_matches_fresh_index(plan):
+    """Incremental reconciles give the same ready tasks as a fresh scan."""
+    index = PlanIndex(plan["tasks"])
+
+    for done in (("a",), ("a", "b"), ("a", "b", "c"), ("a", "b", "c", "d")):
+        updated = complete(plan, *done)
+        index.reconcile(updated["tasks"])
+        assert ready_ids(index.ready_tasks()) == ready_ids(find_ready_tasks(updated))
+
+
+def test_reconcile_status_regression_rebuilds(plan):
+    """A task going back to not-complete re-blocks its dependents."""
+    index = PlanIndex(complete(plan, "a", "b")["tasks"])
+    assert ready_ids(index.ready_tasks()) == ["c"]
+
+    regressed = complete(plan, "a")
+    index.reconcile(regressed["tasks"])
+
+    assert ready_ids(index.ready_tasks()) == ["b", "c"]
+    assert ready_ids(index.ready_tasks()) == ready_ids(find_ready_tasks(regressed))
+
+
+def test_reconcile_task_set_change_rebuilds(plan):
+    """Added tasks and changed dependencies force a rebuild."""
+    index = PlanIndex(complete(plan, "a")["tasks"])
+
+    updated = complete(plan, "a")
+    updated["tasks"].append({"id": "f", "status": "not-complete", "depends_on": []})
+    # "e" now depends on a real, completed task instead of an unknown one
+    updated["tasks"][4]["depends_on"] = ["a"]
+    index.reconcile(updated["tasks"])
+
+    assert ready_ids(index.ready_tasks()) == ["b", "c", "e", "f"]
+    assert ready_ids(index.ready_tasks()) == ready_ids(find_ready_tasks(updated))
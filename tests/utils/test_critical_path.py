@@ -0,0 +1,57 @@
+"""
+Tests for critical_path.py module.
+"""
+
+import pytest
+from utils.critical_path import compute_cp
+
+
+def test_compute_cp_chain():
+    """A task's weight is its own hours plus the longest chain depending on it."""
+    tasks = [
+        {"id": "a", "depends_on": [], "estimated_hours": 2},
+        {"id": "b", "depends_on": ["a"], "estimated_hours": 3},
+        {"id": "c", "depends_on": ["a"], "estimated_hours": 1},
+        {"id": "d", "depends_on": ["b", "c"], "estimated_hours": 4},
+    ]
+
+    cp = compute_cp(tasks)
+
+    assert cp == {"d": 4, "b": 7, "c": 5, "a": 9}
+
+
+def test_compute_cp_default_hours():
+    """Tasks without estimated_hours count as 8 hours."""
+    tasks = [
+        {"id": "a", "depends_on": []},
+        {"id": "b", "depends_on": ["a"], "estimated_hours": 1},
+    ]
+
+    cp = compute_cp(tasks)
+
+    assert cp == {"a": 9, "b": 1}
+
+
+def test_compute_cp_ignores_unknown_dependencies():
+    """Dependencies outside the plan add no work and don't block scoring."""
+    tasks = [
+        {"id": "a", "depends_on": ["missing"], "estimated_hours": 2},
+        {"id": "b", "depends_on": ["a", "also-missing"], "estimated_hours": 3},
+    ]
+
+    cp = compute_cp(tasks)
+
+    assert cp == {"a": 5, "b": 3}
+
+
+def test_compute_cp_cycle_raises():
+    """A dependency cycle is reported instead of silently dropping tasks."""
+    tasks = [
+        {"id": "a", "depends_on": ["c"]},
+        {"id": "b", "depends_on": ["a"]},
+        {"id": "c", "depends_on": ["b"]},
+        {"id": "d", "depends_on": []},
+    ]
+
+    with pytest.raises(ValueError, match="Circular dependency"):
+        compute_cp(tasks)
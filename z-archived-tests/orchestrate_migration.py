@@ -7,15 +7,21 @@ Optionally uses ParallelDetector to find optimal parallel groups.
 # TODO: I've barely looked at this file here..
 
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any
-from prefect import flow, task
+from typing import Dict, List, Any, Optional, Tuple
+from prefect import flow
+from prefect.futures import as_completed
 from prefect.logging import get_run_logger
 
 # Add parent to path
 sys.path.append(str(Path(__file__).parent.parent))
 from src.tasks.run_sessions import run_session_and_wait_for_analysis
-from src.utils.parallel_detector import ParallelDetector
+from src.utils.parallel_detector import ParallelDetector, ParallelGroup
+
+# Every session task run carries this tag. `prefect concurrency-limit create devin-session N`
+# caps in-flight sessions across all flow runs; without a limit set, the tag does nothing.
+SESSION_CONCURRENCY_TAG = "devin-session"
 
 
 def load_plan(repo_path: str) -> Dict[str, Any]:
@@ -27,75 +33,124 @@ def load_plan(repo_path: str) -> Dict[str, Any]:
         print("   Run the initial plan builder first!")
         sys.exit(1)
     
-    import importlib.util
-    spec = importlib.util.spec_from_file_location("migration_plan", plan_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    
-    return module.migration_plan
+    return _load_plan_cached(str(plan_path), plan_path.stat().st_mtime_ns)
+
 
+@lru_cache(maxsize=8)
+def _load_plan_cached(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Compile and run a plan file once per (path, mtime) - edits bust the cache."""
+    namespace = {"__name__": "migration_plan", "__file__": path}
+    exec(compile(Path(path).read_bytes(), path, "exec"), namespace)
+    return namespace["migration_plan"]
 
-def find_ready_tasks(plan: Dict[str, Any], max_parallel: int = 3) -> List[Dict[str, Any]]:
+
+def find_ready_tasks(
+    plan: Dict[str, Any], max_parallel: int = 3
+) -> Tuple[List[Dict[str, Any]], Optional[ParallelDetector], List[ParallelGroup]]:
     """
     Find tasks ready to run using ParallelDetector for deterministic grouping.
     
     Args:
         plan: Migration plan dict
         max_parallel: Max number of parallel sessions
+    
+    Returns:
+        (selected_tasks, detector, parallel_groups) - detector is None and groups
+        empty when fewer than two tasks are ready and no detection was needed
     """
     tasks = plan.get("tasks", [])
-    ready = []
     
-    # Build status map
-    status_map = {t["id"]: t.get("status", "not-complete") for t in tasks}
+    # One bit per task, so readiness is a single mask test instead of a lookup per dependency.
+    # Dependencies missing from the plan map to an extra bit that is never complete.
+    id_to_idx = {t["id"]: i for i, t in enumerate(tasks)}
+    unknown_bit = 1 << len(tasks)
+    complete_mask = 0
+    dep_mask = []
+    for i, task in enumerate(tasks):
+        if task.get("status") == "complete":
+            complete_mask |= 1 << i
+        mask = 0
+        for dep in task.get("depends_on", []):
+            idx = id_to_idx.get(dep)
+            mask |= unknown_bit if idx is None else 1 << idx
+        dep_mask.append(mask)
     
     # Find all ready tasks
-    for task in tasks:
-        if task.get("status", "not-complete") != "not-complete":
-            continue
-        deps = task.get("depends_on", [])
-        if all(status_map.get(dep) == "complete" for dep in deps):
-            ready.append(task)
+    ready = [
+        task for i, task in enumerate(tasks)
+        if task.get("status", "not-complete") == "not-complete" and dep_mask[i] & ~complete_mask == 0
+    ]
     
     if not ready:
-        return []
+        return [], None, []
     
     # Always use ParallelDetector for deterministic grouping
     if len(ready) == 1:
         # Only one task ready, no need for detection
-        return ready
+        return ready, None, []
     
-    # Multiple tasks ready - find truly parallel groups
-    detector = ParallelDetector(ready)
-    parallel_groups = detector.detect_parallel_groups()
+    # Multiple tasks ready - find truly parallel groups (reused while the ready set is unchanged)
+    signature = tuple(
+        (t["id"], tuple(t.get("depends_on", [])), t.get("estimated_hours")) for t in ready
+    )
+    detector, parallel_groups = _detect_cached(signature)
     
     if parallel_groups and len(parallel_groups) > 0:
         # Take the first group (same level, truly independent)
-        first_group_ids = parallel_groups[0].task_ids[:max_parallel]
+        first_group_ids = set(parallel_groups[0].task_ids[:max_parallel])
         selected = [t for t in ready if t["id"] in first_group_ids]
     else:
         # No parallel groups found (tasks have interdependencies)
         # Run just the first task to be safe
         selected = ready[:1]
     
-    return selected
+    return selected, detector, parallel_groups
+
+
+@lru_cache(maxsize=32)
+def _detect_cached(
+    signature: Tuple[Tuple[str, Tuple[str, ...], Optional[float]], ...]
+) -> Tuple[ParallelDetector, List[ParallelGroup]]:
+    """Run ParallelDetector on a ready set given as (id, depends_on, estimated_hours) tuples."""
+    tasks = []
+    for task_id, deps, hours in signature:
+        task = {"id": task_id, "depends_on": list(deps)}
+        if hours is not None:
+            task["estimated_hours"] = hours
+        tasks.append(task)
+    
+    detector = ParallelDetector(tasks)
+    return detector, detector.detect_parallel_groups()
 
 
-def create_task_prompt(task: Dict[str, Any], target_repo: str, parallel_tasks: List[Dict[str, Any]]) -> str:
-    """Create a prompt for a specific task with parallel execution context."""
+def create_task_prompt(
+    task: Dict[str, Any],
+    target_repo: str,
+    parallel_tasks: List[Dict[str, Any]],
+    parallel_lines: Optional[List[str]] = None
+) -> str:
+    """Create a prompt for a specific task with parallel execution context.
+    
+    parallel_lines are the already formatted "• id: title" lines for the other
+    tasks in the batch; they're built from parallel_tasks when omitted.
+    """
     
     # Build parallel context
-    other_tasks = [t for t in parallel_tasks if t['id'] != task['id']]
+    if parallel_lines is None:
+        parallel_lines = [f"• {t['id']}: {t['title']}" for t in parallel_tasks if t['id'] != task['id']]
     parallel_context = ""
-    if other_tasks:
-        parallel_context = "\n## ⚡ Parallel Execution Context\n"
-        parallel_context += f"Running alongside {len(other_tasks)} other task(s):\n"
-        for t in other_tasks:
-            parallel_context += f"• {t['id']}: {t['title']}\n"
-        parallel_context += "\n**Coordination Notes:**\n"
-        parallel_context += "• Avoid modifying the same files as parallel tasks\n"
-        parallel_context += "• Use unique test data/fixtures to prevent conflicts\n"
-        parallel_context += "• Be mindful of shared resources (DB connections, API limits)\n"
+    if parallel_lines:
+        others = "\n".join(parallel_lines)
+        parallel_context = f"""
+## ⚡ Parallel Execution Context
+Running alongside {len(parallel_lines)} other task(s):
+{others}
+
+**Coordination Notes:**
+• Avoid modifying the same files as parallel tasks
+• Use unique test data/fixtures to prevent conflicts
+• Be mindful of shared resources (DB connections, API limits)
+"""
     
     return f"""
 # Task: {task['title']}
@@ -120,21 +175,6 @@ When complete:
 """
 
 
-@task
-def run_parallel_session(task_dict: Dict[str, Any], prompt: str) -> Dict[str, Any]:
-    """Run a single session (wrapped for parallel execution)."""
-    logger = get_run_logger()
-    logger.info(f"🚀 Starting: {task_dict['id']} - {task_dict['title']}")
-    
-    result = run_session_and_wait_for_analysis(
-        prompt=prompt,
-        title=f"{task_dict['id']}: {task_dict['title']}"
-    )
-    
-    logger.info(f"✅ Completed: {result['session_url']}")
-    return result
-
-
 @flow(name="Deterministic Parallel Runner")
 def run_parallel_sessions(
     target_repo: str = "../target-springboot-cics",
@@ -158,7 +198,7 @@ def run_parallel_sessions(
     
     # Step 2: Find ready tasks (always uses ParallelDetector)
     logger.info(f"\n🔍 Finding ready tasks (deterministic grouping)...")
-    ready_tasks = find_ready_tasks(plan, max_parallel)
+    ready_tasks, detector, parallel_groups = find_ready_tasks(plan, max_parallel)
     
     if not ready_tasks:
         logger.warning("   No tasks ready!")
@@ -169,9 +209,12 @@ def run_parallel_sessions(
     
     # Step 3: Show efficiency analysis if multiple tasks
     if len(ready_tasks) > 1:
-        detector = ParallelDetector(ready_tasks)
-        analysis = detector.get_execution_plan()
-        logger.info(f"   Parallel efficiency: {analysis.efficiency_gain:.1f}% faster than serial")
+        # The batch is one independent group from the detection above, so it
+        # finishes when its longest task does - no need to run detection again
+        hours = [detector.task_dict[t["id"]].get("estimated_hours", 8) for t in ready_tasks]
+        efficiency = (sum(hours) - max(hours)) / sum(hours) * 100 if sum(hours) else 0.0
+        logger.info(f"   Parallel efficiency: {efficiency:.1f}% faster than serial")
+        logger.info(f"   ({len(parallel_groups)} parallel group(s) among ready tasks)")
     
     # Step 4: Show what we're running
     logger.info("\n📋 Tasks to run:")
@@ -181,24 +224,39 @@ def run_parallel_sessions(
         logger.info(f"   • {task['id']}: {task['title']}{dep_str}")
     
     # Step 5: Create prompts (with parallel context)
-    prompts = [create_task_prompt(task, target_repo, ready_tasks) for task in ready_tasks]
+    # Each task's line is formatted once and shared by every other task's prompt
+    lines = [f"• {t['id']}: {t['title']}" for t in ready_tasks]
+    prompts = [
+        create_task_prompt(task, target_repo, ready_tasks, lines[:i] + lines[i + 1:])
+        for i, task in enumerate(ready_tasks)
+    ]
     
     # Step 6: Run in parallel
     logger.info("\n🚀 Starting parallel sessions...")
-    futures = []
-    for task, prompt in zip(ready_tasks, prompts):
-        future = run_parallel_session.submit(task, prompt)
-        futures.append(future)
+    for task in ready_tasks:
+        logger.info(f"🚀 Starting: {task['id']} - {task['title']}")
     
-    # Step 7: Collect results
-    results = [f.result() for f in futures]
+    # Submit the session task directly (a wrapper task would only add a second task run per session),
+    # mapped over the whole batch in one call
+    run_session = run_session_and_wait_for_analysis.with_options(tags=[SESSION_CONCURRENCY_TAG])
+    mapped = run_session.map(
+        prompt=prompts,
+        title=[f"{task['id']}: {task['title']}" for task in ready_tasks]
+    )
+    futures = dict(zip(mapped, ready_tasks))
+    
+    # Step 7: Collect results as they finish so one slow session doesn't hold up the others' reports
+    results = {}
+    for future in as_completed(futures):
+        task = futures[future]
+        results[task["id"]] = future.result()
+        logger.info(f"✅ Completed: {task['id']} ({len(results)}/{len(futures)})")
     
     # Step 8: Summary
     logger.info("\n✅ Sessions complete!")
     logger.info("\n📊 Results:")
-    for i, result in enumerate(results):
-        task = ready_tasks[i]
-        logger.info(f"   {task['id']}: {result['session_url']}")
+    for task in ready_tasks:
+        logger.info(f"   {task['id']}: {results[task['id']]['session_url']}")
     
     logger.info("\n⏸️ NEXT STEPS:")
     logger.info("   1. Review PRs from these sessions")
@@ -6,63 +6,185 @@ Tests sessions that request agents to deliver structured output.
 
 import os
 import time
+import atexit
+import asyncio
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator, Tuple
 from dotenv import load_dotenv
 from prefect import flow
 from prefect.logging import get_run_logger
 import json
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; the stdlib parser works the same
+    from json import loads as json_loads
+
 load_dotenv()
 
+# Read once at import instead of on every flow or task run
+_API_KEY = os.environ.get("DEVIN_API_KEY")
+
 # Import the existing session runner
 from src.tasks.run_sessions import (
     create_session,
-    get_session_status,
     send_sleep_message,
     wait_for_status,
     wait_for_analysis,
 )
 
 
+class _LazyJSON:
+    """Log argument that pretty-prints its value only if the record is emitted."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __str__(self) -> str:
+        return json.dumps(self.value, indent=2)
+
+
+# Shared client so polling reuses pooled keep-alive connections
+_CLIENT = httpx.Client(
+    base_url="https://api.devin.ai",
+    timeout=httpx.Timeout(30.0),
+    limits=httpx.Limits(
+        max_connections=100, max_keepalive_connections=20, keepalive_expiry=300
+    ),
+    http2=True,
+)
+atexit.register(_CLIENT.close)
+
+# Limits for the per-flow async client used by the polling loops
+_ASYNC_LIMITS = httpx.Limits(max_keepalive_connections=20)
+
+# Adaptive polling: poll often early, back off while nothing changes and
+# drop back to the fast interval as soon as something does
+_MIN_POLL_INTERVAL = 2.0
+_MAX_POLL_INTERVAL = 30.0
+_POLL_BACKOFF = 1.5
+
+
+def _session_details(response: httpx.Response) -> Dict[str, Any]:
+    """Return the session details from a session GET response."""
+    response.raise_for_status()
+    return json_loads(response.content)
+
+
 def get_structured_output(api_key: str, session_id: str) -> Optional[Dict[str, Any]]:
     """
     Retrieve structured output from a session.
     This checks the 'structured_output' field in the session details.
     """
-    url = f"https://api.devin.ai/v1/sessions/{session_id}"
-    headers = {"Authorization": f"Bearer {api_key}"}
+    response = _CLIENT.get(
+        f"/v1/sessions/{session_id}",
+        headers={"Authorization": f"Bearer {api_key}"},
+    )
+
+    data = _session_details(response)
+    return data.get("structured_output")
+
+
+async def get_session_status_async(
+    client: httpx.AsyncClient, api_key: str, session_id: str
+) -> Dict[str, Any]:
+    """Async variant of get_session_status for the polling loops."""
+    response = await client.get(
+        f"/v1/sessions/{session_id}",
+        headers={"Authorization": f"Bearer {api_key}"},
+    )
+    return _session_details(response)
 
-    with httpx.Client() as client:
-        response = client.get(url, headers=headers)
-        response.raise_for_status()
 
-    data = response.json()
+async def get_structured_output_async(
+    client: httpx.AsyncClient, api_key: str, session_id: str
+) -> Optional[Dict[str, Any]]:
+    """Async variant of get_structured_output for the polling loops."""
+    data = await get_session_status_async(client, api_key, session_id)
     return data.get("structured_output")
 
 
+async def _poll(
+    client: httpx.AsyncClient,
+    api_key: str,
+    session_id: str,
+    timeout: int,
+    interval: float = _MIN_POLL_INTERVAL,
+) -> AsyncIterator[Tuple[int, Optional[str], Optional[Dict[str, Any]]]]:
+    """
+    Poll a session until it reaches a terminal state or the timeout expires.
+    Yields (elapsed, status, structured_output) once per poll.
+
+    The wait between polls grows by _POLL_BACKOFF while nothing changes (up
+    to _MAX_POLL_INTERVAL) and resets to `interval` on any change.
+    """
+    start_time = time.monotonic()
+    current_interval = interval
+    previous = None
+
+    while time.monotonic() - start_time < timeout:
+        # Status and structured output come from the same session resource
+        details = await get_session_status_async(client, api_key, session_id)
+        status = details.get("status_enum")
+        current_output = details.get("structured_output")
+
+        yield int(time.monotonic() - start_time), status, current_output
+
+        if status in ["blocked", "finished", "expired"]:
+            return
+
+        if (status, current_output) != previous:
+            previous = (status, current_output)
+            current_interval = interval
+        else:
+            current_interval = min(_MAX_POLL_INTERVAL, current_interval * _POLL_BACKOFF)
+
+        await asyncio.sleep(current_interval)
+
+
 def poll_for_structured_output(
-    api_key: str, session_id: str, max_polls: int = 60, poll_interval: int = 10
+    api_key: str,
+    session_id: str,
+    max_polls: int = 60,
+    poll_interval: float = _MIN_POLL_INTERVAL,
 ) -> Optional[Dict[str, Any]]:
     """
     Poll for structured output updates during session execution.
     Returns the latest structured output or None if not available.
+
+    Backs off adaptively while the output is unchanged.
     """
     logger = get_run_logger()
     structured_output = None
+    interval = poll_interval
 
     for i in range(max_polls):
         current_output = get_structured_output(api_key, session_id)
         if current_output and current_output != structured_output:
             structured_output = current_output
             logger.info(f"📊 Structured output updated (poll {i + 1}):")
-            logger.info(json.dumps(structured_output, indent=2))
+            logger.info("%s", _LazyJSON(structured_output))
+            interval = poll_interval
+        else:
+            interval = min(_MAX_POLL_INTERVAL, interval * _POLL_BACKOFF)
 
-        time.sleep(poll_interval)
+        time.sleep(interval)
 
     return structured_output
 
 
+def _async_client() -> httpx.AsyncClient:
+    """Build the async client used by a single polling flow."""
+    return httpx.AsyncClient(
+        base_url="https://api.devin.ai",
+        timeout=httpx.Timeout(30.0),
+        limits=_ASYNC_LIMITS,
+        http2=True,
+    )
+
+
 def create_session_with_structured_output(
     api_key: str, prompt: str, title: str, structured_schema: Dict[str, Any]
 ) -> str:
@@ -82,13 +204,26 @@ Update the structured output as you work. Keep it simple and direct.
     return create_session(api_key, formatted_prompt, title)
 
 
+async def create_session_with_structured_output_async(
+    api_key: str, prompt: str, title: str, structured_schema: Dict[str, Any]
+) -> str:
+    """Async variant of create_session_with_structured_output."""
+    return await asyncio.to_thread(
+        create_session_with_structured_output,
+        api_key,
+        prompt,
+        title,
+        structured_schema,
+    )
+
+
 @flow(log_prints=True)
-def test_migration_analysis_structured():
+async def test_migration_analysis_structured():
     """
     Test migration analysis with structured output.
     """
     logger = get_run_logger()
-    api_key = os.environ.get("DEVIN_API_KEY")
+    api_key = _API_KEY
     if not api_key:
         raise ValueError("DEVIN_API_KEY not found in environment")
 
@@ -114,7 +249,7 @@ Focus on:
     logger.info("🚀 Starting Migration Analysis Test with Structured Output")
 
     # Create session with structured output
-    session_id = create_session_with_structured_output(
+    session_id = await create_session_with_structured_output_async(
         api_key, prompt, "Migration Analysis - Structured Output Test", migration_schema
     )
 
@@ -128,43 +263,38 @@ Focus on:
     logger.info("📊 Starting to poll for structured output...")
 
     # Wait for session to reach blocked state while polling for output
-    start_time = time.time()
+    status = None
     timeout = 2700  # 45 minutes
 
-    while time.time() - start_time < timeout:
-        # Check session status
-        details = get_session_status(api_key, session_id)
-        status = details.get("status_enum")
-
-        # Get structured output
-        current_output = get_structured_output(api_key, session_id)
-        if current_output and current_output != structured_output:
-            structured_output = current_output
-            poll_count += 1
-            logger.info(f"📊 Structured output update #{poll_count}:")
-            logger.info(json.dumps(structured_output, indent=2))
+    async with _async_client() as client:
+        async for elapsed, status, current_output in _poll(
+            client, api_key, session_id, timeout
+        ):
+            if current_output and current_output != structured_output:
+                structured_output = current_output
+                poll_count += 1
+                logger.info(f"📊 Structured output update #{poll_count}:")
+                logger.info("%s", _LazyJSON(structured_output))
 
-        elapsed = int(time.time() - start_time)
-        logger.debug(f"Status: {status} (elapsed: {elapsed}s)")
+            logger.debug(f"Status: {status} (elapsed: {elapsed}s)")
 
         if status in ["blocked", "finished", "expired"]:
             logger.info(f"✅ Session reached {status} state")
-            break
 
-        time.sleep(20)  # Poll every 20 seconds
-
-    # Send sleep message if blocked
-    if status == "blocked":
-        logger.info("📨 Sending sleep message...")
-        send_sleep_message(api_key, session_id)
+        # Send sleep message if blocked
+        if status == "blocked":
+            logger.info("📨 Sending sleep message...")
+            await asyncio.to_thread(send_sleep_message, api_key, session_id)
 
-    # Get final structured output
-    final_output = get_structured_output(api_key, session_id)
+        # Get final structured output
+        final_output = await get_structured_output_async(client, api_key, session_id)
 
     # Also get session analysis
     logger.info("⏳ Waiting for session analysis...")
     try:
-        analysis = wait_for_analysis(api_key, session_id, 420, 20)
+        analysis = await asyncio.to_thread(
+            wait_for_analysis, api_key, session_id, poll_interval=20
+        )
         logger.info("✅ Session analysis received")
     except TimeoutError:
         logger.warning("⚠️ Session analysis timeout")
@@ -186,7 +316,7 @@ Focus on:
 
     if final_output:
         logger.info("\n✅ Final Structured Output:")
-        logger.info(json.dumps(final_output, indent=2))
+        logger.info("%s", _LazyJSON(final_output))
     else:
         logger.warning("⚠️ No structured output received")
 
@@ -194,12 +324,12 @@ Focus on:
 
 
 @flow(log_prints=True)
-def test_pr_review_structured():
+async def test_pr_review_structured():
     """
     Test PR review with structured output format.
     """
     logger = get_run_logger()
-    api_key = os.environ.get("DEVIN_API_KEY")
+    api_key = _API_KEY
     if not api_key:
         raise ValueError("DEVIN_API_KEY not found in environment")
 
@@ -220,32 +350,26 @@ Look for:
 
     logger.info("🚀 Starting PR Review Test with Structured Output")
 
-    session_id = create_session_with_structured_output(
+    session_id = await create_session_with_structured_output_async(
         api_key, prompt, "PR Review - Structured Output Test", pr_review_schema
     )
 
     # Similar polling logic as above
     structured_output = None
-    start_time = time.time()
+    status = None
     timeout = 900  # 15 minutes for code review
 
-    while time.time() - start_time < timeout:
-        details = get_session_status(api_key, session_id)
-        status = details.get("status_enum")
-
-        current_output = get_structured_output(api_key, session_id)
-        if current_output and current_output != structured_output:
-            structured_output = current_output
-            logger.info("📊 Structured output updated:")
-            logger.info(json.dumps(structured_output, indent=2))
-
-        if status in ["blocked", "finished", "expired"]:
-            break
-
-        time.sleep(15)
+    async with _async_client() as client:
+        async for _, status, current_output in _poll(
+            client, api_key, session_id, timeout
+        ):
+            if current_output and current_output != structured_output:
+                structured_output = current_output
+                logger.info("📊 Structured output updated:")
+                logger.info("%s", _LazyJSON(structured_output))
 
     if status == "blocked":
-        send_sleep_message(api_key, session_id)
+        await asyncio.to_thread(send_sleep_message, api_key, session_id)
 
     return {
         "session_id": session_id,
@@ -255,12 +379,12 @@ Look for:
 
 
 @flow(log_prints=True)
-def test_progress_tracking_structured():
+async def test_progress_tracking_structured():
     """
     Test progress tracking with structured output.
     """
     logger = get_run_logger()
-    api_key = os.environ.get("DEVIN_API_KEY")
+    api_key = _API_KEY
     if not api_key:
         raise ValueError("DEVIN_API_KEY not found in environment")
 
@@ -280,34 +404,26 @@ Identify:
 
     logger.info("🚀 Starting Progress Tracking Test with Structured Output")
 
-    session_id = create_session_with_structured_output(
+    session_id = await create_session_with_structured_output_async(
         api_key, prompt, "Test Coverage Analysis - Structured Output", progress_schema
     )
 
     # Track progress updates
     updates = []
-    start_time = time.time()
+    status = None
     timeout = 600  # 10 minutes
 
-    while time.time() - start_time < timeout:
-        details = get_session_status(api_key, session_id)
-        status = details.get("status_enum")
-
-        current_output = get_structured_output(api_key, session_id)
-        if current_output:
-            updates.append(
-                {"timestamp": time.time() - start_time, "output": current_output}
-            )
-            logger.info(f"📊 Progress update at {int(time.time() - start_time)}s:")
-            logger.info(json.dumps(current_output, indent=2))
-
-        if status in ["blocked", "finished", "expired"]:
-            break
-
-        time.sleep(10)
+    async with _async_client() as client:
+        async for elapsed, status, current_output in _poll(
+            client, api_key, session_id, timeout
+        ):
+            if current_output:
+                updates.append({"timestamp": elapsed, "output": current_output})
+                logger.info(f"📊 Progress update at {elapsed}s:")
+                logger.info("%s", _LazyJSON(current_output))
 
     if status == "blocked":
-        send_sleep_message(api_key, session_id)
+        await asyncio.to_thread(send_sleep_message, api_key, session_id)
 
     return {
         "session_id": session_id,
@@ -318,12 +434,12 @@ Identify:
 
 
 @flow(log_prints=True)
-def test_simple_structured():
+async def test_simple_structured():
     """
     Ultra-simple structured output test.
     """
     logger = get_run_logger()
-    api_key = os.environ.get("DEVIN_API_KEY")
+    api_key = _API_KEY
     if not api_key:
         raise ValueError("DEVIN_API_KEY not found in environment")
 
@@ -336,36 +452,39 @@ def test_simple_structured():
 
     logger.info("🚀 Starting Simple Structured Output Test")
 
-    session_id = create_session_with_structured_output(
+    session_id = await create_session_with_structured_output_async(
         api_key, prompt, "Simple Structured Output Test", simple_schema
     )
 
     # Wait and poll for output
     structured_output = None
-    start_time = time.time()
+    status = None
     timeout = 300  # 5 minutes
 
-    while time.time() - start_time < timeout:
-        details = get_session_status(api_key, session_id)
-        status = details.get("status_enum")
-
-        current_output = get_structured_output(api_key, session_id)
-        if current_output:
-            structured_output = current_output
-            logger.info("📊 Structured output received:")
-            logger.info(json.dumps(structured_output, indent=2))
-
-        if status in ["blocked", "finished", "expired"]:
-            break
-
-        time.sleep(10)
+    async with _async_client() as client:
+        async for _, status, current_output in _poll(
+            client, api_key, session_id, timeout
+        ):
+            if current_output:
+                structured_output = current_output
+                logger.info("📊 Structured output received:")
+                logger.info("%s", _LazyJSON(structured_output))
 
     if status == "blocked":
-        send_sleep_message(api_key, session_id)
+        await asyncio.to_thread(send_sleep_message, api_key, session_id)
 
     return {"session_id": session_id, "structured_output": structured_output}
 
 
+async def run_all_tests():
+    """Run the three structured output flows concurrently."""
+    return await asyncio.gather(
+        test_migration_analysis_structured(),
+        test_pr_review_structured(),
+        test_progress_tracking_structured(),
+    )
+
+
 if __name__ == "__main__":
     import sys
 
@@ -375,7 +494,7 @@ if __name__ == "__main__":
         print("\n" + "=" * 60)
         print("SIMPLE STRUCTURED OUTPUT TEST")
         print("=" * 60)
-        result = test_simple_structured()
+        result = asyncio.run(test_simple_structured())
         print("\n✅ Test Complete")
         print(
             f"Structured output: {'Received' if result.get('structured_output') else 'Not received'}"
@@ -386,7 +505,7 @@ if __name__ == "__main__":
         print("\n" + "=" * 60)
         print("MIGRATION ANALYSIS STRUCTURED OUTPUT TEST")
         print("=" * 60)
-        migration_result = test_migration_analysis_structured()
+        migration_result = asyncio.run(test_migration_analysis_structured())
         print("\n✅ Test Complete")
         print(
             f"Structured output: {'Received' if migration_result.get('structured_output') else 'Not received'}"
@@ -398,20 +517,10 @@ if __name__ == "__main__":
         print("DEVIN API STRUCTURED OUTPUT TESTS")
         print("=" * 60)
 
-        # Test 1: Migration Analysis
-        print("\n📋 Test 1: Migration Analysis with Structured Output")
-        print("-" * 60)
-        migration_result = test_migration_analysis_structured()
-
-        # Test 2: PR Review
-        print("\n📋 Test 2: PR Review with Structured Output")
-        print("-" * 60)
-        pr_result = test_pr_review_structured()
-
-        # Test 3: Progress Tracking
-        print("\n📋 Test 3: Progress Tracking with Structured Output")
+        # Tests 1-3 run concurrently: Migration Analysis, PR Review, Progress Tracking
+        print("\n📋 Running Migration Analysis, PR Review and Progress Tracking tests")
         print("-" * 60)
-        progress_result = test_progress_tracking_structured()
+        migration_result, pr_result, progress_result = asyncio.run(run_all_tests())
 
         # Summary
         print("\n" + "=" * 60)
@@ -1,16 +1,43 @@
 #!/usr/bin/env python3
 """View all three artifact types."""
 
+import asyncio
 from prefect.artifacts import Artifact
+from prefect.client.orchestration import get_client
+
+# In-process memo so repeated lookups don't hit the Prefect API again
+_ARTIFACT_CACHE = {}
+
+
+async def fetch_all(keys):
+    """Fetch artifacts by key concurrently over one Prefect client."""
+    missing = [k for k in keys if k not in _ARTIFACT_CACHE]
+    if missing:
+        async with get_client() as client:
+            results = await asyncio.gather(
+                *[Artifact.aget(k, client=client) for k in missing]
+            )
+        _ARTIFACT_CACHE.update(zip(missing, results))
+    return [_ARTIFACT_CACHE[k] for k in keys]
+
 
 session_id = "a2dfa695"
 
+analysis, improvements, knowledge = asyncio.run(
+    fetch_all(
+        [
+            f"analysis-{session_id}",
+            f"improvements-{session_id}",
+            f"knowledge-{session_id}",
+        ]
+    )
+)
+
 print("=" * 60)
 print("📦 ARTIFACT FAMILY - CLEAN SEPARATION OF CONCERNS")
 print("=" * 60)
 
 # 1. Analysis artifact - Just timeline and issues
-analysis = Artifact.get(f"analysis-{session_id}")
 if analysis:
     print("\n1️⃣ ANALYSIS ARTIFACT (Timeline + Issues)")
     print("-" * 40)
@@ -18,7 +45,6 @@ if analysis:
     print("...")
 
 # 2. Improvements artifact - Prompt suggestions AND action items
-improvements = Artifact.get(f"improvements-{session_id}")
 if improvements:
     print("\n\n2️⃣ SESSION IMPROVEMENTS ARTIFACT")
     print("-" * 40)
@@ -26,7 +52,6 @@ if improvements:
     print("...")
 
 # 3. Knowledge artifact
-knowledge = Artifact.get(f"knowledge-{session_id}")
 if knowledge:
     print("\n\n3️⃣ KNOWLEDGE ARTIFACT (Future)")
     print("-" * 40)